@@ -158,8 +158,9 @@ export default function KYCPage() {
 
   const fetchDocuments = useCallback(async () => {
     try {
+      // The list is cursor-paginated: { next, previous, results }
       const response = await api.get('/users/kyc-documents/');
-      setDocuments(response.data);
+      setDocuments(response.data.results);
     } catch (error) {
       console.error('Failed to fetch documents:', error);
     } finally {
@@ -1,5 +1,7 @@
 from django.contrib import admin
 from django.contrib import messages
+from django.db import transaction
+from django.db.models import Q
 from .models import Agent, AgentTier
 from users.models import OviiUser
 from users.tasks import send_realtime_notification
@@ -19,6 +21,13 @@ class AgentAdmin(admin.ModelAdmin):
     actions = ["approve_agents"]
     raw_id_fields = ("user",)
     ordering = ("-created_at",)
+    list_select_related = ("user", "tier")
+    NOTIFICATION_CHUNK_SIZE = 100
+
+    def get_queryset(self, request):
+        # Join the user and tier up front so the changelist, search and the
+        # approve action do not fetch them row by row.
+        return super().get_queryset(request).select_related("user", "tier")
 
     @admin.action(description="Approve selected agents and set their role")
     def approve_agents(self, request, queryset):
@@ -27,25 +36,33 @@ class AgentAdmin(admin.ModelAdmin):
         `is_approved` flag to True and updates the associated user's role
         to 'AGENT'.
         """
-        approved_count = 0
-        already_approved_count = 0
-
-        # We use select_related to pre-fetch the user object, avoiding extra DB queries.
-        for agent in queryset.select_related("user"):
-            if agent.is_approved and agent.user.role == OviiUser.Role.AGENT:
-                already_approved_count += 1
-                continue
-
-            agent.is_approved = True
-            agent.user.role = OviiUser.Role.AGENT
-            agent.save(update_fields=["is_approved"])
-            agent.user.save(update_fields=["role"])
-
-            send_realtime_notification.delay(
-                agent.user.id,
-                "Congratulations! Your agent account has been approved and is now active.",
+        # Only agents that are not yet fully approved need to be touched.
+        user_ids = list(
+            queryset.filter(
+                Q(is_approved=False) | ~Q(user__role=OviiUser.Role.AGENT)
+            ).values_list("user_id", flat=True)
+        )
+        approved_count = len(user_ids)
+        already_approved_count = queryset.count() - approved_count
+
+        if user_ids:
+            # Two bulk UPDATEs instead of two saves per selected agent.
+            with transaction.atomic():
+                Agent.objects.filter(user_id__in=user_ids).update(is_approved=True)
+                OviiUser.objects.filter(pk__in=user_ids).update(
+                    role=OviiUser.Role.AGENT
+                )
+
+            # Pack the notifications into chunked messages so the broker sees
+            # one send per NOTIFICATION_CHUNK_SIZE agents instead of one per agent.
+            message = (
+                "Congratulations! Your agent account has been approved "
+                "and is now active."
             )
-            approved_count += 1
+            send_realtime_notification.chunks(
+                [(user_id, message) for user_id in user_ids],
+                self.NOTIFICATION_CHUNK_SIZE,
+            ).apply_async()
 
         if approved_count > 0:
             self.message_user(
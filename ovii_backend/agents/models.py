@@ -66,5 +66,11 @@ class Agent(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Backs the newest-first ordering of the admin changelist.
+            models.Index(fields=["-created_at"], name="agent_created_at_desc"),
+        ]
+
     def __str__(self):
         return f"Agent: {self.user.phone_number} ({self.business_name})"
@@ -17,10 +17,9 @@ class IsApprovedAgent(BasePermission):
 
     def has_permission(self, request, view):
         user = request.user
-        return bool(
-            user
-            and user.is_authenticated
-            and user.role == OviiUser.Role.AGENT
-            and hasattr(user, "agent_profile")
-            and user.agent_profile.is_approved
-        )
+        if not (user and user.is_authenticated and user.role == OviiUser.Role.AGENT):
+            return False
+        # The profile is joined in by OviiJWTAuthentication, so this is a
+        # cached attribute read rather than a query.
+        agent_profile = getattr(user, "agent_profile", None)
+        return bool(agent_profile and agent_profile.is_approved)
@@ -11,8 +11,11 @@ from wallets.models import Transaction
 
 class AgentProfileSerializer(serializers.ModelSerializer):
     """Serializer to display an agent's profile details."""
-    tier = serializers.StringRelatedField()
-    commission_rate = serializers.SerializerMethodField()
+    # Plain source lookups on the joined tier; no per-object method dispatch.
+    tier = serializers.ReadOnlyField(source="tier.name", default=None)
+    commission_rate = serializers.ReadOnlyField(
+        source="tier.commission_rate", default=None
+    )
 
     class Meta:
         model = Agent
@@ -27,11 +30,6 @@ class AgentProfileSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["agent_code", "is_approved", "created_at"]
 
-    def get_commission_rate(self, obj):
-        if obj.tier:
-            return obj.tier.commission_rate
-        return None
-
 
 class AgentOnboardingSerializer(serializers.ModelSerializer):
     """Serializer for onboarding a new agent."""
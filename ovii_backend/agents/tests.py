@@ -1,3 +1,59 @@
-from django.test import TestCase
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.admin.sites import AdminSite
+from django.test import TestCase, RequestFactory
+
+from users.models import OviiUser
+from .admin import AgentAdmin
+from .models import Agent
+
+
+class ApproveAgentsActionTest(TestCase):
+    """Tests for the bulk `approve_agents` admin action."""
+
+    def setUp(self):
+        self.admin = AgentAdmin(Agent, AdminSite())
+        self.request = RequestFactory().post("/")
+        self.pending = []
+        for i in range(3):
+            user = OviiUser.objects.create_user(
+                phone_number=f"+26377123450{i}", first_name="Agent", last_name=str(i)
+            )
+            self.pending.append(
+                Agent.objects.create(
+                    user=user,
+                    agent_code=f"AG{i}",
+                    business_name="Shop",
+                    location="Harare",
+                )
+            )
+        approved_user = OviiUser.objects.create_user(
+            phone_number="+263771234509", role=OviiUser.Role.AGENT
+        )
+        self.approved = Agent.objects.create(
+            user=approved_user,
+            agent_code="AG9",
+            business_name="Shop",
+            location="Harare",
+            is_approved=True,
+        )
+
+    @patch("agents.admin.send_realtime_notification")
+    def test_approve_agents_bulk_updates(self, mock_task):
+        with patch.object(self.admin, "message_user") as mock_message:
+            with self.assertNumQueries(6):
+                self.admin.approve_agents(self.request, Agent.objects.all())
+
+        for agent in self.pending:
+            agent.refresh_from_db()
+            agent.user.refresh_from_db()
+            self.assertTrue(agent.is_approved)
+            self.assertEqual(agent.user.role, OviiUser.Role.AGENT)
+
+        args, chunk_size = mock_task.chunks.call_args.args
+        self.assertCountEqual(
+            [user_id for user_id, _ in args], [a.user_id for a in self.pending]
+        )
+        self.assertEqual(chunk_size, AgentAdmin.NOTIFICATION_CHUNK_SIZE)
+        mock_task.chunks.return_value.apply_async.assert_called_once()
+        self.assertEqual(mock_message.call_count, 2)
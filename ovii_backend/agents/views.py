@@ -4,9 +4,12 @@ Date: 2024-05-21
 Description: Defines API views for the agents app.
 """
 
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from .models import Agent
 from .permissions import IsApprovedAgent
 from .serializers import (
     AgentProfileSerializer,
@@ -18,6 +21,7 @@ from wallets.serializers import (
     CustomerCashOutRequestSerializer,
     TransactionSerializer,
 )
+from users.models import OviiUser
 from wallets.models import Transaction
 from wallets.services import (
     create_transaction,
@@ -41,12 +45,11 @@ class AgentOnboardingView(generics.CreateAPIView):
         """
         Creates a new agent and sets the user's role to AGENT.
         """
-        from users.models import OviiUser
-
         user = self.request.user
         user.role = OviiUser.Role.AGENT
-        user.save()
-        serializer.save(user=user)
+        with transaction.atomic():
+            user.save(update_fields=["role"])
+            serializer.save(user=user)
 
 
 class AgentProfileView(generics.RetrieveAPIView):
@@ -58,8 +61,22 @@ class AgentProfileView(generics.RetrieveAPIView):
     permission_classes = [IsApprovedAgent]
 
     def get_object(self):
-        # The permission class ensures agent_profile exists.
-        return self.request.user.agent_profile
+        # The permission class ensures agent_profile exists. Fetch it together
+        # with its tier so the serializer does not lazily load the FK.
+        return (
+            Agent.objects.select_related("tier")
+            .only(
+                "user_id",
+                "agent_code",
+                "business_name",
+                "location",
+                "is_approved",
+                "created_at",
+                "tier__name",
+                "tier__commission_rate",
+            )
+            .get(user=self.request.user)
+        )
 
 
 class AgentCashInView(generics.CreateAPIView):
@@ -136,11 +153,31 @@ class AgentTransactionHistoryView(generics.ListAPIView):
     def get_queryset(self):
         """
         Returns the transactions where the agent is either the sender or the receiver.
+
+        The two sides are queried separately and combined with UNION ALL so
+        each branch can use its own (wallet, timestamp) index instead of a
+        BitmapOr followed by a full sort.
         """
         user = self.request.user
-        return Transaction.objects.filter(
-            models.Q(wallet__user=user) | models.Q(related_wallet__user=user)
-        ).order_by("-timestamp")
+        sent = Transaction.objects.filter(wallet__user=user)
+        # Self-transfers already appear in `sent`; keep them out of this branch
+        # so UNION ALL does not return them twice.
+        received = Transaction.objects.filter(related_wallet__user=user).exclude(
+            wallet__user=user
+        )
+        return sent.union(received, all=True).order_by("-timestamp")
+
+    def paginate_queryset(self, queryset):
+        """
+        Loads the charge and compensated transaction for the whole page at once.
+
+        Combined queries do not support select_related, so without this the
+        serializer would fetch both relations row by row.
+        """
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            prefetch_related_objects(page, "charge", "compensates")
+        return page
 
 
 class AgentCommissionHistoryView(generics.ListAPIView):
@@ -156,6 +193,11 @@ class AgentCommissionHistoryView(generics.ListAPIView):
         Returns the commission transactions for the agent.
         """
         user = self.request.user
-        return Transaction.objects.filter(
-            wallet__user=user, transaction_type=Transaction.TransactionType.COMMISSION
-        ).order_by("-timestamp")
+        return (
+            Transaction.objects.filter(
+                wallet__user=user,
+                transaction_type=Transaction.TransactionType.COMMISSION,
+            )
+            .only(*CommissionSerializer.Meta.fields)
+            .order_by("-timestamp")
+        )
@@ -0,0 +1,41 @@
+import logging
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import (
+    exception_handler as drf_exception_handler,
+    set_rollback,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def logged_exception_handler(exc, context):
+    """
+    DRF exception handler for views that opt in via get_exception_handler().
+
+    Logs handled API errors (validation, auth, throttling, ...) as warnings and
+    turns unexpected exceptions into a logged, generic 500 response, so those
+    views do not need their own try/except blocks around validation and saving.
+    """
+    view = context.get("view")
+    view_name = view.__class__.__name__ if view else "unknown view"
+
+    response = drf_exception_handler(exc, context)
+    if response is not None:
+        logger.warning(
+            "%s request failed with status %s. Error: %s",
+            view_name,
+            response.status_code,
+            response.data,
+        )
+        return response
+
+    logger.error(
+        "An unexpected error occurred in %s. Error: %s", view_name, exc, exc_info=exc
+    )
+    set_rollback()
+    return Response(
+        {"detail": "An unexpected server error occurred."},
+        status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+    )
@@ -1,4 +1,4 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 
 
@@ -30,3 +30,15 @@ class StandardResultsPagination(PageNumberPagination):
                 "results": schema,
             },
         }
+
+
+class StandardCursorPagination(CursorPagination):
+    """
+    Keyset pagination for per-user lists that only need next/previous links.
+    Skips the COUNT(*) query and the OFFSET scan of page-number pagination.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "-id"
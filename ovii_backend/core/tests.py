@@ -1,3 +1,28 @@
-from django.test import TestCase
+import datetime
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+
+from .renderers import ORJSONRenderer
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    """Tests that ORJSONRenderer matches DRF's JSONRenderer output."""
+
+    def test_matches_drf_json_renderer(self):
+        data = {
+            "amount": Decimal("10.50"),
+            "timestamp": datetime.datetime(
+                2024, 5, 21, 12, 0, tzinfo=datetime.timezone.utc
+            ),
+            "name": "Ovii\u2028",
+            1: None,
+        }
+        self.assertEqual(
+            ORJSONRenderer().render(data),
+            JSONRenderer().render(data),
+        )
+
+    def test_none_renders_empty(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
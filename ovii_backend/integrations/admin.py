@@ -7,12 +7,19 @@ Description: Admin configuration for integrations app.
 import logging
 
 from django.contrib import admin, messages
+from django.db import DatabaseError
 from django.utils.translation import gettext_lazy as _
 from .models import WhatsAppConfig, WhatsAppTemplate
 
 logger = logging.getLogger(__name__)
 
 
+def _is_changelist(request):
+    """Return True when the request is rendering an admin changelist page."""
+    match = getattr(request, "resolver_match", None)
+    return bool(match and match.url_name and match.url_name.endswith("_changelist"))
+
+
 @admin.register(WhatsAppConfig)
 class WhatsAppConfigAdmin(admin.ModelAdmin):
     """Admin interface for WhatsApp configuration."""
@@ -28,6 +35,17 @@ class WhatsAppConfigAdmin(admin.ModelAdmin):
     list_filter = ["is_active", "created_at", "api_version"]
     search_fields = ["waba_id", "phone_number_id", "api_version"]
     readonly_fields = ["created_at", "updated_at"]
+    # Columns needed by list_display, __str__ and has_delete_permission. The
+    # changelist never loads the access token or webhook secret.
+    changelist_fields = (
+        "id",
+        "waba_id",
+        "phone_number_id",
+        "api_version",
+        "is_active",
+        "created_at",
+        "updated_at",
+    )
     
     fieldsets = (
         (_("WhatsApp API Credentials"), {
@@ -58,18 +76,29 @@ class WhatsAppConfigAdmin(admin.ModelAdmin):
             return f"{obj.phone_number_id[:15]}..."
         return obj.phone_number_id
     phone_number_id_display.short_description = "Phone Number ID"
+
+    def get_queryset(self, request):
+        """Restrict changelist queries to the columns shown in the list."""
+        queryset = super().get_queryset(request)
+        if _is_changelist(request):
+            queryset = queryset.only(*self.changelist_fields)
+        return queryset
     
+    def save_model(self, request, obj, form, change):
+        """On edit, write only the columns the form changed (e.g. a token refresh)."""
+        if not change:
+            super().save_model(request, obj, form, change)
+        elif form.changed_data:
+            obj.save(update_fields=[*form.changed_data, "updated_at"])
+
     def has_delete_permission(self, request, obj=None):
         """
-        Allow deletion only if:
-        - The config is inactive, OR
-        - There's at least one other active configuration
+        Allow deletion only of inactive configs.
+
+        uniq_one_active_whatsapp_config allows a single active config, so an
+        active one is always the only one and must be deactivated first.
         """
-        if obj and obj.is_active:
-            # Check if there are other active configurations
-            active_count = WhatsAppConfig.objects.filter(is_active=True).count()
-            return active_count > 1
-        return True
+        return not (obj and obj.is_active)
 
 
 @admin.register(WhatsAppTemplate)
@@ -89,6 +118,18 @@ class WhatsAppTemplateAdmin(admin.ModelAdmin):
     search_fields = ["name", "template_id", "rejection_reason"]
     readonly_fields = ["created_at", "updated_at", "components"]
     actions = ["pull_templates_from_meta"]
+    # Skip the rejection_reason text, components JSON and payload_hash on the
+    # changelist.
+    changelist_fields = (
+        "id",
+        "name",
+        "language",
+        "category",
+        "status",
+        "template_id",
+        "last_synced_at",
+        "created_at",
+    )
 
     fieldsets = (
         (_("Template Information"), {
@@ -111,6 +152,13 @@ class WhatsAppTemplateAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        """Restrict changelist queries to the columns shown in the list."""
+        queryset = super().get_queryset(request)
+        if _is_changelist(request):
+            queryset = queryset.only(*self.changelist_fields)
+        return queryset
+
     def has_add_permission(self, request):
         """Templates are created via management command, not manually."""
         return False
@@ -135,59 +183,31 @@ class WhatsAppTemplateAdmin(admin.ModelAdmin):
             )
             return
 
-        created_count = 0
-        updated_count = 0
-        failed_count = 0
-        now = timezone.now()
-        for meta_template in meta_templates:
-            name = meta_template.get("name")
-            if not name:
-                continue
-            rejected_reason = meta_template.get("rejected_reason") or ""
-            if rejected_reason.upper() == "NONE":
-                rejected_reason = ""
-            try:
-                _obj, created = WhatsAppTemplate.objects.update_or_create(
-                    name=name,
-                    language=meta_template.get("language") or "en",
-                    defaults={
-                        "category": meta_template.get("category") or "",
-                        "status": (meta_template.get("status") or "PENDING").upper(),
-                        "template_id": meta_template.get("id"),
-                        "components": meta_template.get("components"),
-                        "rejection_reason": rejected_reason[:500],
-                        "last_synced_at": now,
-                    },
-                )
-            except Exception as e:
-                failed_count += 1
-                logger.error(
-                    f"Failed to store template '{name}' "
-                    f"({meta_template.get('language')}) during admin pull: {e}"
-                )
-                continue
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
-
-        if failed_count:
-            self.message_user(
-                request,
-                _("Pulled %(total)d template(s) from Meta: %(created)d created, "
-                  "%(updated)d updated, %(failed)d failed (see server logs).")
-                % {
-                    "total": len(meta_templates),
-                    "created": created_count,
-                    "updated": updated_count,
-                    "failed": failed_count,
-                },
-                level=messages.WARNING,
+        try:
+            stored, created_keys = WhatsAppTemplate.objects.upsert_from_meta(
+                meta_templates, timezone.now()
             )
-        else:
+        except DatabaseError as e:
+            logger.error(f"Failed to store templates during admin pull: {e}")
             self.message_user(
                 request,
-                _("Pulled %(total)d template(s) from Meta: %(created)d created, %(updated)d updated.")
-                % {"total": len(meta_templates), "created": created_count, "updated": updated_count},
-                level=messages.SUCCESS,
+                _("Failed to store templates pulled from Meta: %(error)s")
+                % {"error": e},
+                level=messages.ERROR,
+            )
+            return
+
+        created_count = len(created_keys)
+        self.message_user(
+            request,
+            _(
+                "Pulled %(total)d template(s) from Meta: "
+                "%(created)d created, %(updated)d updated."
             )
+            % {
+                "total": len(meta_templates),
+                "created": created_count,
+                "updated": len(stored) - created_count,
+            },
+            level=messages.SUCCESS,
+        )
@@ -0,0 +1,26 @@
+"""
+Author: Moreblessing Nyemba +263787211325
+Date: 2026-10-16
+Description: Signal handlers for the integrations app.
+"""
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ACTIVE_CONFIG_CACHE_ALIAS, ACTIVE_CONFIG_CACHE_KEY, WhatsAppConfig
+
+
+@receiver(post_save, sender=WhatsAppConfig)
+@receiver(post_delete, sender=WhatsAppConfig)
+def invalidate_active_whatsapp_config(sender, **kwargs):
+    """
+    Drop the cached active config whenever any config changes.
+
+    The delete waits for the commit; clearing it earlier would let a
+    concurrent reader cache the old row again before the change is visible.
+    """
+    transaction.on_commit(
+        lambda: caches[ACTIVE_CONFIG_CACHE_ALIAS].delete(ACTIVE_CONFIG_CACHE_KEY)
+    )
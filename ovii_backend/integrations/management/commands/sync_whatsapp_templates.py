@@ -13,19 +13,23 @@ This command can:
 """
 
 from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
 from django.utils import timezone
 from integrations.whatsapp_templates import get_all_templates, convert_template_to_meta_format
 from integrations.services import WhatsAppClient
 from integrations.models import WhatsAppTemplate
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import hashlib
 import json
 import logging
-import requests
 import time
 
 # Constants
 MAX_REJECTION_REASON_LENGTH = 500  # Maximum length for rejection reason in database
 MAX_ERROR_DISPLAY_LENGTH = 500  # Maximum length for raw response in command output
 RATE_LIMIT_DELAY = 1.5  # Delay in seconds between template creation requests
+MAX_CREATE_WORKERS = 4  # Concurrent template creation requests in flight
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +50,31 @@ def truncate_text(text, max_length):
     return text[:max_length] if len(text) > max_length else text
 
 
+def hash_payload(meta_payload):
+    """
+    Return a stable SHA-256 hex digest of a Meta template payload.
+
+    Keys are sorted so the digest only changes when the content does.
+    """
+    return hashlib.sha256(json.dumps(meta_payload, sort_keys=True).encode()).hexdigest()
+
+
+@functools.lru_cache(maxsize=256)
+def base_language_code(lang_code):
+    """
+    Normalize language code for comparison.
+    Handles variations like 'en', 'en_US', 'en-US'.
+    Returns the base language code (e.g., 'en'), so 'en', 'en_US' and
+    'en_GB' all compare equal while 'en' and 'es' do not.
+    """
+    if not lang_code:
+        return ''
+    # Replace hyphens with underscores for consistency
+    normalized = lang_code.replace('-', '_')
+    # Split on underscore and take the first part (base language)
+    return normalized.split('_')[0].lower()
+
+
 class Command(BaseCommand):
     help = "Sync WhatsApp message templates with Meta Business Manager via Graph API"
 
@@ -169,51 +198,24 @@ class Command(BaseCommand):
 
         created_count = 0
         updated_count = 0
-        failed_count = 0
-        now = timezone.now()
 
-        for meta_template in meta_templates:
-            name = meta_template.get('name')
-            language = meta_template.get('language') or 'en'
-            if not name:
-                logger.warning(f"Skipping Meta template with no name: {meta_template}")
-                continue
-
-            status = (meta_template.get('status') or 'PENDING').upper()
-            rejected_reason = meta_template.get('rejected_reason') or ''
-            if rejected_reason.upper() == 'NONE':
-                rejected_reason = ''
-
-            try:
-                db_template, created = WhatsAppTemplate.objects.update_or_create(
-                    name=name,
-                    language=language,
-                    defaults={
-                        'category': meta_template.get('category') or '',
-                        'status': status,
-                        'template_id': meta_template.get('id'),
-                        'components': meta_template.get('components'),
-                        'rejection_reason': truncate_text(
-                            rejected_reason, MAX_REJECTION_REASON_LENGTH
-                        ),
-                        'last_synced_at': now,
-                    },
-                )
-            except Exception as e:
-                failed_count += 1
-                logger.error(f"Failed to store template '{name}' ({language}): {e}")
-                self.stdout.write(
-                    self.style.ERROR(f"✗ {name} ({language}): failed to store — {e}")
-                )
-                continue
+        try:
+            stored, created_keys = WhatsAppTemplate.objects.upsert_from_meta(
+                meta_templates, timezone.now()
+            )
+        except DatabaseError as e:
+            logger.error("Failed to store templates pulled from Meta: %s", e)
+            raise CommandError(f"Failed to store templates pulled from Meta: {e}")
 
-            if created:
+        for (name, language), db_template in stored.items():
+            if (name, language) in created_keys:
                 created_count += 1
                 marker = self.style.SUCCESS('+ created')
             else:
                 updated_count += 1
                 marker = self.style.WARNING('~ updated')
 
+            status = db_template.status
             status_style = (
                 self.style.SUCCESS if status == 'APPROVED'
                 else self.style.ERROR if status == 'REJECTED'
@@ -221,13 +223,13 @@ class Command(BaseCommand):
             )
             self.stdout.write(
                 f"{marker}  {name} ({language})  "
-                f"[{status_style(status)}]  ID: {meta_template.get('id')}"
+                f"[{status_style(status)}]  ID: {db_template.template_id}"
             )
-            if rejected_reason:
+            if db_template.rejection_reason:
                 self.stdout.write(f"    Rejection reason: {db_template.rejection_reason}")
-            if verbose and meta_template.get('components'):
+            if verbose and db_template.components:
                 self.stdout.write(
-                    f"    Components: {json.dumps(meta_template['components'], indent=6)}"
+                    f"    Components: {json.dumps(db_template.components, indent=6)}"
                 )
 
         # Summary
@@ -238,102 +240,205 @@ class Command(BaseCommand):
         self.stdout.write(f"Templates in Meta: {len(meta_templates)}")
         self.stdout.write(self.style.SUCCESS(f"+ Created locally: {created_count}"))
         self.stdout.write(self.style.WARNING(f"~ Updated locally: {updated_count}"))
-        if failed_count:
-            self.stdout.write(self.style.ERROR(f"✗ Failed: {failed_count}"))
         self.stdout.write('')
 
     def _display_templates(self, templates, output_format):
         """Display templates in text or JSON format."""
         if output_format == 'json':
-            self.stdout.write(json.dumps(templates, indent=2))
+            self.stdout.write(json.dumps(dict(templates), indent=2))
             return
 
-        self.stdout.write(self.style.SUCCESS('=' * 80))
-        self.stdout.write(self.style.SUCCESS('OVII WHATSAPP MESSAGE TEMPLATES'))
-        self.stdout.write(self.style.SUCCESS('=' * 80))
-        self.stdout.write('')
-        
-        self.stdout.write(self.style.WARNING(
-            'These templates can be synced to Meta Business Manager automatically.'
-        ))
-        self.stdout.write(self.style.WARNING(
-            'Run: python manage.py sync_whatsapp_templates (without --display-only)'
-        ))
-        self.stdout.write('')
-        self.stdout.write(self.style.WARNING('=' * 80))
-        self.stdout.write('')
+        # Build the whole listing and write it once rather than line by line
+        lines = [
+            self.style.SUCCESS('=' * 80),
+            self.style.SUCCESS('OVII WHATSAPP MESSAGE TEMPLATES'),
+            self.style.SUCCESS('=' * 80),
+            '',
+            self.style.WARNING(
+                'These templates can be synced to Meta Business Manager automatically.'
+            ),
+            self.style.WARNING(
+                'Run: python manage.py sync_whatsapp_templates (without --display-only)'
+            ),
+            '',
+            self.style.WARNING('=' * 80),
+            '',
+        ]
 
         for template_key, template_data in templates.items():
-            self.stdout.write(self.style.HTTP_INFO(f"Template: {template_data['name']}"))
-            self.stdout.write(f"  Category: {template_data['category']}")
-            self.stdout.write(f"  Language: {template_data['language']}")
-            self.stdout.write(f"  Description: {template_data['description']}")
-            self.stdout.write('')
+            lines.append(self.style.HTTP_INFO(f"Template: {template_data['name']}"))
+            lines.append(f"  Category: {template_data['category']}")
+            lines.append(f"  Language: {template_data['language']}")
+            lines.append(f"  Description: {template_data['description']}")
+            lines.append('')
             
             # Display structure
-            self.stdout.write(self.style.SUCCESS("  Structure:"))
+            lines.append(self.style.SUCCESS("  Structure:"))
             structure = template_data['structure']
             
             if structure.get('header'):
-                self.stdout.write(f"    Header: {structure['header']}")
+                lines.append(f"    Header: {structure['header']}")
             
             if structure.get('body'):
-                self.stdout.write(f"    Body:")
-                body_lines = structure['body'].split('\n')
-                for line in body_lines:
-                    self.stdout.write(f"      {line}")
+                lines.append(f"    Body:")
+                lines.extend(f"      {line}" for line in structure['body'].splitlines())
             
             if structure.get('footer'):
-                self.stdout.write(f"    Footer: {structure['footer']}")
+                lines.append(f"    Footer: {structure['footer']}")
             
             # Display variables
             if template_data.get('variables'):
-                self.stdout.write('')
-                self.stdout.write(self.style.SUCCESS("  Variables:"))
+                lines.append('')
+                lines.append(self.style.SUCCESS("  Variables:"))
                 for i, var in enumerate(template_data['variables'], start=1):
-                    self.stdout.write(f"    {{{{{i}}}}}: {var}")
+                    lines.append(f"    {{{{{i}}}}}: {var}")
             
             # Display example
             if template_data.get('example'):
-                self.stdout.write('')
-                self.stdout.write(self.style.SUCCESS("  Example Values:"))
+                lines.append('')
+                lines.append(self.style.SUCCESS("  Example Values:"))
                 for example_values in template_data['example']['body_text']:
-                    self.stdout.write(f"    {', '.join(example_values)}")
+                    lines.append(f"    {', '.join(example_values)}")
             
-            self.stdout.write('')
-            self.stdout.write('-' * 80)
-            self.stdout.write('')
+            lines.append('')
+            lines.append('-' * 80)
+            lines.append('')
+
+        lines.append(self.style.SUCCESS('Total templates: ' + str(len(templates))))
+        lines.append('')
+        self.stdout.write('\n'.join(lines))
+
+    def _index_meta_templates(self, client):
+        """
+        Fetch every template on the WABA in one paginated listing.
+
+        Returns:
+            dict: Meta templates keyed by (name, base language code). When Meta
+            holds several regional variants of a language, the first one listed
+            wins, matching the old per-template lookup.
+        """
+        meta_templates = client.list_templates(
+            fields="id,name,status,language,category,rejected_reason"
+        )
+        index = {}
+        for meta_template in meta_templates:
+            key = (
+                meta_template.get('name'),
+                base_language_code(meta_template.get('language', '')),
+            )
+            index.setdefault(key, meta_template)
+        return index
 
-        self.stdout.write(self.style.SUCCESS('Total templates: ' + str(len(templates))))
+    def _fetch_meta_index(self, client, verbose=False):
+        """
+        Fetch the Meta template index, reporting (not raising) failures.
+
+        Returns:
+            dict or None: The index from _index_meta_templates, or None if the
+            listing failed and template status is unknown
+        """
+        self.stdout.write("Fetching existing templates from Meta...")
+        try:
+            meta_index = self._index_meta_templates(client)
+        except Exception as check_error:
+            error_type = type(check_error).__name__
+            logger.warning(
+                "Template status listing failed: %s - %s", error_type, check_error
+            )
+            self.stdout.write(
+                self.style.WARNING(f"  ⚠  Could not check template status: {error_type}")
+            )
+            if verbose:
+                self.stdout.write(f"     Details: {check_error}")
+            meta_index = None
         self.stdout.write('')
+        return meta_index
 
-    def _normalize_language_code(self, lang_code):
+    def _load_local_templates(self, templates):
         """
-        Normalize language code for comparison.
-        Handles variations like 'en', 'en_US', 'en-US'.
-        Returns the base language code (e.g., 'en').
+        Fetch the local WhatsAppTemplate rows for the given templates.
+
+        Missing rows are inserted with a single bulk_create as PENDING.
+
+        Returns:
+            dict: WhatsAppTemplate instances keyed by (name, language)
         """
-        if not lang_code:
-            return ''
-        # Replace hyphens with underscores for consistency
-        normalized = lang_code.replace('-', '_')
-        # Split on underscore and take the first part (base language)
-        return normalized.split('_')[0].lower()
-    
-    def _languages_match(self, lang1, lang2):
+        def fetch():
+            queryset = WhatsAppTemplate.objects.filter(name__in=templates.keys())
+            return {
+                (db_template.name, db_template.language): db_template
+                for db_template in queryset.order_by()
+            }
+
+        local_templates = fetch()
+        missing = [
+            WhatsAppTemplate(
+                name=template_name,
+                language=template_data['language'],
+                category=template_data['category'],
+                status='PENDING',
+            )
+            for template_name, template_data in templates.items()
+            if (template_name, template_data['language']) not in local_templates
+        ]
+        if missing:
+            # ignore_conflicts leaves pks unset, so re-read the rows afterwards
+            WhatsAppTemplate.objects.bulk_create(missing, ignore_conflicts=True)
+            local_templates = fetch()
+        return local_templates
+
+    def _create_templates_in_meta(
+        self, client, payloads, verbose=False, delay=RATE_LIMIT_DELAY
+    ):
         """
-        Check if two language codes match.
-        Matches base language codes regardless of regional variants.
-        Examples:
-        - 'en' matches 'en_US' -> True
-        - 'en_US' matches 'en' -> True
-        - 'en_US' matches 'en_GB' -> True (both are English)
-        - 'en' matches 'es' -> False
+        Create templates in Meta from a pool of worker threads.
+
+        Requests are still started at least `delay` seconds apart to respect
+        Meta's rate limits, but each one no longer waits for the previous
+        response. Workers only talk to Meta; all database writes stay on the
+        calling thread.
+
+        Returns:
+            list: A (response, error) tuple per payload, in payload order
+        """
+        def create(payload):
+            try:
+                return client.create_template(payload), None
+            except Exception as api_error:
+                return None, api_error
+
+        futures = []
+        with ThreadPoolExecutor(max_workers=MAX_CREATE_WORKERS) as executor:
+            for position, payload in enumerate(payloads):
+                if position:
+                    if verbose:
+                        self.stdout.write(self.style.WARNING(f"  Waiting {delay}s before next template..."))
+                    time.sleep(delay)
+                futures.append(executor.submit(create, payload))
+        return [future.result() for future in futures]
+
+    def _store_synced_templates(self, dirty_templates, synced_at):
         """
-        base1 = self._normalize_language_code(lang1)
-        base2 = self._normalize_language_code(lang2)
-        return base1 == base2
+        Write the local rows changed during a sync.
 
+        Each row's UPDATE sets only the columns its sync branch changed, with
+        one bulk_update per distinct set of columns.
+        """
+        if not dirty_templates:
+            return
+        by_fields = {}
+        for db_template, fields in dirty_templates.values():
+            db_template.updated_at = synced_at
+            by_fields.setdefault(frozenset(fields), []).append(db_template)
+        try:
+            with transaction.atomic():
+                for fields, db_templates in by_fields.items():
+                    WhatsAppTemplate.objects.bulk_update(
+                        db_templates, [*sorted(fields), 'updated_at'], batch_size=500
+                    )
+        except DatabaseError as e:
+            logger.error("Failed to store synced template status: %s", e)
+            raise CommandError(f"Failed to store synced template status: {e}")
 
     def _sync_templates_to_meta(self, templates, verbose=False, delay=RATE_LIMIT_DELAY):
         """Sync templates to Meta via Graph API.
@@ -358,64 +463,84 @@ class Command(BaseCommand):
         except Exception as e:
             raise CommandError(f"Failed to initialize WhatsApp client: {e}")
 
+        # Every row touched by this run is stamped with the same sync time
+        synced_at = timezone.now()
+
+        # Meta's template listing is fetched once, and only if some template
+        # actually needs its status checked (see _fetch_meta_index)
+        meta_index = None
+        meta_fetched = False
+
         success_count = 0
         failed_count = 0
         skipped_count = 0
         
         # Track which errors have shown raw response to avoid duplicates
         raw_response_shown = set()
-        
-        # Get total count
-        total_templates = len(templates)
-        current_position = 0
 
-        for template_name, template_data in templates.items():
-            current_position += 1
-            self.stdout.write(f"Processing template: {template_name}")
-            
-            # Track if we attempted to create this template (for rate limiting delay)
-            attempted_creation = False
+        # Load (and create where missing) the local record of every template up front
+        local_templates = self._load_local_templates(templates)
+
+        # Local rows changed during the sync and the columns each one changed,
+        # keyed by pk and written together at the end
+        dirty_templates = {}
+
+        def mark_dirty(db_template, *fields):
+            _, changed = dirty_templates.setdefault(
+                db_template.pk, (db_template, set())
+            )
+            changed.update(fields)
+
+        # Templates that still need creating in Meta: (name, db_template, payload)
+        pending_creation = []
+
+        try:
+            for template_name, template_data in templates.items():
+                self.stdout.write(f"Processing template: {template_name}")
             
-            try:
-                # Get or create database record
-                db_template, created = WhatsAppTemplate.objects.get_or_create(
-                    name=template_name,
-                    language=template_data['language'],
-                    defaults={
-                        'category': template_data['category'],
-                        'status': 'PENDING',
-                    }
-                )
-                
-                # First, check if template exists in Meta
-                self.stdout.write(f"  Checking template status in Meta...")
                 try:
-                    status_response = client.get_template_status(template_name)
-                    templates_in_meta = status_response.get('data', [])
-                    
-                    if templates_in_meta:
-                        # Template exists in Meta
-                        # Find the matching language version
-                        matching_template = None
-                        for meta_template in templates_in_meta:
-                            meta_lang = meta_template.get('language', '')
-                            template_lang = template_data['language']
-                            
-                            # Use helper method for proper language matching
-                            if self._languages_match(meta_lang, template_lang):
-                                matching_template = meta_template
-                                break
-                        
+                    db_template = local_templates[(template_name, template_data['language'])]
+
+                    # Convert to Meta format; unchanged approved templates need no API calls
+                    meta_payload = convert_template_to_meta_format(template_name)
+                    payload_hash = hash_payload(meta_payload)
+                    if db_template.status == 'APPROVED' and db_template.payload_hash == payload_hash:
+                        self.stdout.write(
+                            self.style.SUCCESS(f"  ✓ Template unchanged since it was APPROVED")
+                        )
+                        self.stdout.write(f"    Template ID: {db_template.template_id}")
+                        skipped_count += 1
+                        self.stdout.write('')
+                        continue
+                    db_template.payload_hash = payload_hash
+
+                    # First, check if template exists in Meta
+                    if not meta_fetched:
+                        meta_index = self._fetch_meta_index(client, verbose)
+                        meta_fetched = True
+                    if meta_index is None:
+                        self.stdout.write(f"  Status unknown, proceeding with creation attempt...")
+                    else:
+                        matching_template = meta_index.get(
+                            (template_name, base_language_code(template_data['language']))
+                        )
+
                         if matching_template:
                             template_id = matching_template.get('id')
                             template_status = matching_template.get('status', 'UNKNOWN').upper()
-                            
+
                             # Update database with current Meta status
                             db_template.template_id = template_id
                             db_template.status = template_status
-                            db_template.last_synced_at = timezone.now()
-                            db_template.save()
-                            
+                            db_template.last_synced_at = synced_at
+                            mark_dirty(
+                                db_template,
+                                'template_id',
+                                'status',
+                                'last_synced_at',
+                                'payload_hash',
+                            )
+
                             # Check if we should skip or update
                             if template_status == 'APPROVED':
                                 self.stdout.write(
@@ -444,79 +569,59 @@ class Command(BaseCommand):
                                 )
                                 # Continue to creation attempt for unknown statuses
                         else:
-                            self.stdout.write(f"  Template not found for language '{template_data['language']}', will create...")
-                    else:
-                        self.stdout.write(f"  Template does not exist in Meta, will create...")
-                    
-                except requests.RequestException as check_error:
-                    # Network or HTTP errors
-                    error_type = type(check_error).__name__
-                    error_msg = str(check_error)
-                    response = getattr(check_error, 'response', None)
-                    status_code = response.status_code if response and hasattr(response, 'status_code') else None
-                    
-                    logger.warning(
-                        f"Template status check failed for '{template_name}': "
-                        f"{error_type} - {error_msg}"
-                    )
-                    
-                    self.stdout.write(
-                        self.style.WARNING(f"  ⚠  Could not check template status: {error_type}")
-                    )
-                    if status_code:
-                        self.stdout.write(f"     HTTP Status: {status_code}")
-                    if verbose:
-                        self.stdout.write(f"     Details: {error_msg}")
-                    self.stdout.write(f"  Proceeding with creation attempt...")
-                except (ValueError, KeyError) as check_error:
-                    # Data parsing errors
-                    error_type = type(check_error).__name__
-                    logger.warning(
-                        f"Template status check failed for '{template_name}': "
-                        f"{error_type} - {check_error}"
-                    )
-                    self.stdout.write(
-                        self.style.WARNING(f"  ⚠  Could not parse template status: {error_type}")
-                    )
+                            self.stdout.write(
+                                f"  Template not found in Meta for language '{template_data['language']}', will create..."
+                            )
+
+                    # Queue for creation (only if we didn't skip above)
+                    # Log payload in verbose mode
                     if verbose:
-                        self.stdout.write(f"     Details: {check_error}")
-                    self.stdout.write(f"  Proceeding with creation attempt...")
-                except Exception as check_error:
-                    # Catch-all for unexpected errors
-                    error_type = type(check_error).__name__
+                        self.stdout.write(self.style.WARNING(f"  Template payload for Meta API:"))
+                        self.stdout.write(f"    {json.dumps(meta_payload, indent=6)}")
+                
+                    # Also log at DEBUG level for server logs
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "Converted template '%s' to Meta format: %s",
+                            template_name,
+                            json.dumps(meta_payload, indent=2),
+                        )
+
+                    pending_creation.append((template_name, db_template, meta_payload))
+                    self.stdout.write(f"  Queued for creation in Meta")
+
+                except (ValueError, KeyError) as e:
+                    # Handle data/parsing errors
+                    error_type = type(e).__name__
                     logger.error(
-                        f"Unexpected error checking template '{template_name}': "
-                        f"{error_type} - {check_error}"
+                        "Data error processing template '%s': %s - %s", template_name, error_type, e
                     )
                     self.stdout.write(
-                        self.style.WARNING(f"  ⚠  Unexpected error: {error_type}")
+                        self.style.ERROR(f"  ✗ Data error ({error_type}): {e}")
                     )
-                    if verbose:
-                        self.stdout.write(f"     Details: {check_error}")
-                    self.stdout.write(f"  Proceeding with creation attempt...")
-                
-                # Convert to Meta format and create (only if we didn't skip above)
-                meta_payload = convert_template_to_meta_format(template_name)
-                
-                # Log payload in verbose mode
-                if verbose:
-                    self.stdout.write(self.style.WARNING(f"  Template payload for Meta API:"))
-                    self.stdout.write(f"    {json.dumps(meta_payload, indent=6)}")
-                
-                # Also log at DEBUG level for server logs
-                logger.debug(f"Converted template '{template_name}' to Meta format: {json.dumps(meta_payload, indent=2)}")
-                
-                # Create template in Meta
-                attempted_creation = True  # Mark that we're attempting creation
-                try:
-                    response = client.create_template(meta_payload)
-                    
+                    failed_count += 1
+            
+                self.stdout.write('')
+
+            # Create the queued templates in Meta, overlapping the HTTP round-trips
+            creation_results = self._create_templates_in_meta(
+                client, [payload for _, _, payload in pending_creation], verbose, delay
+            )
+
+            for (template_name, db_template, _), (response, api_error) in zip(
+                pending_creation, creation_results
+            ):
+                self.stdout.write(f"Creating template: {template_name}")
+                if api_error is None:
                     # Update database record
                     db_template.template_id = response.get('id')
                     db_template.status = response.get('status', 'PENDING').upper()
-                    db_template.last_synced_at = timezone.now()
-                    db_template.save()
-                    
+                    db_template.last_synced_at = synced_at
+                    mark_dirty(
+                        db_template,
+                        'template_id', 'status', 'last_synced_at', 'payload_hash',
+                    )
+                
                     self.stdout.write(
                         self.style.SUCCESS(f"  ✓ Template created successfully (ID: {response.get('id')})")
                     )
@@ -524,11 +629,10 @@ class Command(BaseCommand):
                         self.style.WARNING(f"    Status: {response.get('status', 'PENDING')}")
                     )
                     success_count += 1
-                    
-                except Exception as api_error:
+                else:
                     error_msg = str(api_error)
                     error_id = id(api_error)  # Use object ID for tracking
-                    
+                
                     # Extract error attributes safely
                     status_code = getattr(api_error, 'status_code', None)
                     error_code = getattr(api_error, 'error_code', None)
@@ -541,7 +645,7 @@ class Command(BaseCommand):
                     full_error = getattr(api_error, 'full_error', None)
                     response_headers = getattr(api_error, 'response_headers', None)
                     json_parse_error = getattr(api_error, 'json_parse_error', None)
-                    
+                
                     # In verbose mode, show raw response immediately
                     if verbose:
                         if raw_response and error_id not in raw_response_shown:
@@ -558,15 +662,15 @@ class Command(BaseCommand):
                                     self.stdout.write(f"    {key}: {value}")
                             else:
                                 self.stdout.write(self.style.WARNING(f"  Response Headers: (unexpected format, type={type(response_headers).__name__})"))
-                    
+                
                     # Check if template already exists using status code/error code
                     is_duplicate = getattr(api_error, 'is_duplicate', False)
-                    
+                
                     if is_duplicate:
                         # Handle race condition: template may have been created between 
                         # our status check and creation attempt
-                        db_template.last_synced_at = timezone.now()
-                        db_template.save()
+                        db_template.last_synced_at = synced_at
+                        mark_dirty(db_template, 'last_synced_at', 'payload_hash')
                         self.stdout.write(
                             self.style.WARNING(f"  ⚠  Template already exists in Meta (race condition)")
                         )
@@ -577,18 +681,18 @@ class Command(BaseCommand):
                     else:
                         # Real error - store truncated rejection reason and display detailed info
                         db_template.rejection_reason = error_msg[:MAX_REJECTION_REASON_LENGTH]
-                        db_template.save()
-                        
+                        mark_dirty(db_template, 'rejection_reason', 'payload_hash')
+                    
                         # Display basic error
                         self.stdout.write(
                             self.style.ERROR(f"  ✗ Failed: {error_msg}")
                         )
-                        
+                    
                         # Always show these fields for debugging (even if None to indicate missing data)
                         self.stdout.write(f"    HTTP Status: {status_code}")
                         self.stdout.write(f"    Error Code: {error_code}")
                         self.stdout.write(f"    Error Type: {error_type}")
-                        
+                    
                         # Show optional fields only if present
                         if error_subcode:
                             self.stdout.write(f"    Error Subcode: {error_subcode}")
@@ -598,7 +702,7 @@ class Command(BaseCommand):
                             self.stdout.write(f"    Details: {error_user_msg}")
                         if fbtrace_id:
                             self.stdout.write(f"    FB Trace ID: {fbtrace_id}")
-                        
+                    
                         # In verbose mode, show more details
                         if verbose:
                             # Only show raw response if we didn't already display it above
@@ -609,7 +713,7 @@ class Command(BaseCommand):
                                 self.stdout.write(self.style.WARNING(f"    Full Error Object: {json.dumps(full_error, indent=6)}"))
                             if json_parse_error:
                                 self.stdout.write(self.style.WARNING(f"    JSON Parse Error: {json_parse_error}"))
-                        
+                    
                         # If we got HTTP 400 with no detailed error info, show a helpful message
                         if status_code == 400 and not error_code and not error_type:
                             self.stdout.write(
@@ -618,34 +722,14 @@ class Command(BaseCommand):
                             self.stdout.write(
                                 self.style.WARNING(f"       This usually indicates a payload format issue. Check the logs for details.")
                             )
-                        
+                    
                         failed_count += 1
-                
-            except (ValueError, KeyError) as e:
-                # Handle data/parsing errors
-                error_type = type(e).__name__
-                logger.error(f"Data error processing template '{template_name}': {error_type} - {e}")
-                self.stdout.write(
-                    self.style.ERROR(f"  ✗ Data error ({error_type}): {e}")
-                )
-                failed_count += 1
-            except Exception as e:
-                # Catch-all for unexpected errors
-                error_type = type(e).__name__
-                logger.error(f"Unexpected error processing template '{template_name}': {error_type} - {e}")
-                self.stdout.write(
-                    self.style.ERROR(f"  ✗ Unexpected error ({error_type}): {e}")
-                )
-                failed_count += 1
-            
-            self.stdout.write('')
-            
-            # Add delay between template processing to avoid rate limits
-            # Only delay if we attempted creation and this isn't the last template
-            if attempted_creation and current_position < total_templates:
-                if verbose:
-                    self.stdout.write(self.style.WARNING(f"  Waiting {delay}s before next template..."))
-                time.sleep(delay)
+
+                self.stdout.write('')
+        finally:
+            # Store what this run learned even if it stops early, so templates
+            # already created in Meta are not created again by the next run
+            self._store_synced_templates(dirty_templates, synced_at)
 
         # Summary
         self.stdout.write(self.style.SUCCESS('=' * 80))
@@ -677,37 +761,41 @@ class Command(BaseCommand):
         except Exception as e:
             raise CommandError(f"Failed to initialize WhatsApp client: {e}")
 
+        try:
+            meta_index = self._index_meta_templates(client)
+        except Exception as e:
+            raise CommandError(f"Failed to fetch template status from Meta: {e}")
+
+        now = timezone.now()
         for template_name, template_data in templates.items():
             self.stdout.write(f"Template: {template_name}")
-            
+
+            template_info = meta_index.get(
+                (template_name, base_language_code(template_data['language']))
+            )
+            if not template_info:
+                self.stdout.write(self.style.WARNING("  Not found in Meta"))
+                self.stdout.write('')
+                continue
+
+            status = template_info.get('status', 'UNKNOWN').upper()
+            template_id = template_info.get('id')
+
+            self.stdout.write(f"  Status: {status}")
+            self.stdout.write(f"  Template ID: {template_id}")
+
+            # Update database if template exists (a single UPDATE, no row fetch)
             try:
-                # Get status from Meta
-                status_response = client.get_template_status(template_name)
-                
-                # Update database if template exists
-                db_templates = WhatsAppTemplate.objects.filter(
+                WhatsAppTemplate.objects.filter(
                     name=template_name,
                     language=template_data['language']
+                ).update(
+                    status=status,
+                    template_id=template_id,
+                    last_synced_at=now,
+                    updated_at=now,
                 )
-                
-                if status_response.get('data'):
-                    for template_info in status_response['data']:
-                        status = template_info.get('status', 'UNKNOWN').upper()
-                        template_id = template_info.get('id')
-                        
-                        self.stdout.write(f"  Status: {status}")
-                        self.stdout.write(f"  Template ID: {template_id}")
-                        
-                        # Update database
-                        if db_templates.exists():
-                            db_template = db_templates.first()
-                            db_template.status = status
-                            db_template.template_id = template_id
-                            db_template.save()
-                else:
-                    self.stdout.write(self.style.WARNING("  Not found in Meta"))
-                
-            except Exception as e:
+            except DatabaseError as e:
                 self.stdout.write(self.style.ERROR(f"  Error: {e}"))
-            
+
             self.stdout.write('')
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integrations', '0004_merge_20260707_1830'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='whatsapptemplate',
+            name='payload_hash',
+            field=models.CharField(blank=True, default='', help_text='SHA-256 of the payload last synced to Meta, used to skip unchanged templates', max_length=64, verbose_name='Payload Hash'),
+        ),
+    ]
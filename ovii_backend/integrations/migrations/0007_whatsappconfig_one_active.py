@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integrations', '0006_whatsapptemplate_payload_hash'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='whatsappconfig',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('is_active',), name='uniq_one_active_whatsapp_config', violation_error_message='Only one WhatsApp configuration can be active at a time. Please deactivate the current configuration first.'),
+        ),
+    ]
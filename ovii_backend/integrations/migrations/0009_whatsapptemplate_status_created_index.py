@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integrations', '0007_whatsappconfig_one_active'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='whatsapptemplate',
+            index=models.Index(fields=['status', '-created_at'], name='wat_status_created_idx'),
+        ),
+    ]
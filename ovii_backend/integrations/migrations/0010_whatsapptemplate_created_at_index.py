@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integrations', '0009_whatsapptemplate_status_created_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='whatsapptemplate',
+            index=models.Index(fields=['-created_at'], name='wat_created_at_desc'),
+        ),
+    ]
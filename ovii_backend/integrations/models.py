@@ -4,9 +4,14 @@ Date: 2024-12-10
 Description: Models for third-party integrations including WhatsApp configuration.
 """
 
+from django.core.cache import caches
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-from django.core.exceptions import ValidationError
+
+# The "shared" alias is Redis-backed, so web and Celery workers see one entry
+ACTIVE_CONFIG_CACHE_ALIAS = "shared"
+ACTIVE_CONFIG_CACHE_KEY = "integrations:whatsapp_config:active"
+ACTIVE_CONFIG_CACHE_TIMEOUT = 300  # Seconds; saves and deletes invalidate sooner
 
 
 class WhatsAppConfig(models.Model):
@@ -55,27 +60,99 @@ class WhatsAppConfig(models.Model):
         verbose_name = _("WhatsApp Configuration")
         verbose_name_plural = _("WhatsApp Configurations")
         ordering = ["-created_at"]
+        constraints = [
+            # Enforced by a partial unique index, so plain ORM saves need no extra query
+            models.UniqueConstraint(
+                fields=["is_active"],
+                condition=models.Q(is_active=True),
+                name="uniq_one_active_whatsapp_config",
+                violation_error_message=_(
+                    "Only one WhatsApp configuration can be active at a time. "
+                    "Please deactivate the current configuration first."
+                ),
+            ),
+        ]
 
     def __str__(self):
         return f"WhatsApp Config (Phone ID: {self.phone_number_id[:15]}...)"
 
-    def clean(self):
-        """Ensure only one active configuration exists."""
-        if self.is_active:
-            # Check if there's another active configuration
-            active_configs = WhatsAppConfig.objects.filter(is_active=True)
-            if self.pk:
-                active_configs = active_configs.exclude(pk=self.pk)
-            if active_configs.exists():
-                raise ValidationError(
-                    _("Only one WhatsApp configuration can be active at a time. "
-                      "Please deactivate the current configuration first.")
-                )
-
-    def save(self, *args, **kwargs):
-        """Override save to ensure validation."""
-        self.full_clean()
-        super().save(*args, **kwargs)
+
+def get_active_whatsapp_config():
+    """
+    Return the active WhatsAppConfig (or None), cached between calls.
+
+    The config changes rarely but is read for every outbound WhatsApp message
+    and webhook verification. The entry lives in the shared cache and is
+    dropped once a transaction that saves or deletes a config commits (see
+    integrations.handlers). Writes that bypass model signals, such as
+    queryset.update() or raw SQL, are only picked up when the entry expires,
+    so they can be served stale for up to ACTIVE_CONFIG_CACHE_TIMEOUT seconds.
+    """
+    return caches[ACTIVE_CONFIG_CACHE_ALIAS].get_or_set(
+        ACTIVE_CONFIG_CACHE_KEY,
+        lambda: WhatsAppConfig.objects.filter(is_active=True).first(),
+        ACTIVE_CONFIG_CACHE_TIMEOUT,
+    )
+
+
+class WhatsAppTemplateManager(models.Manager):
+    """Manager for WhatsAppTemplate with bulk helpers for syncing from Meta."""
+
+    MAX_REJECTION_REASON_LENGTH = 500
+
+    def upsert_from_meta(self, meta_templates, synced_at):
+        """
+        Store templates listed by Meta's Graph API in one INSERT ... ON CONFLICT.
+
+        Templates without a name are skipped. If Meta lists the same
+        (name, language) twice, the last entry wins.
+
+        Returns:
+            tuple: (stored templates keyed by (name, language), set of the
+            (name, language) keys that did not exist locally before)
+        """
+        rows = {}
+        for meta_template in meta_templates:
+            name = meta_template.get("name")
+            if not name:
+                continue
+            language = meta_template.get("language") or "en"
+            rejected_reason = meta_template.get("rejected_reason") or ""
+            if rejected_reason.upper() == "NONE":
+                rejected_reason = ""
+            rows[(name, language)] = self.model(
+                name=name,
+                language=language,
+                category=meta_template.get("category") or "",
+                status=(meta_template.get("status") or "PENDING").upper(),
+                template_id=meta_template.get("id"),
+                components=meta_template.get("components"),
+                rejection_reason=rejected_reason[:self.MAX_REJECTION_REASON_LENGTH],
+                last_synced_at=synced_at,
+            )
+        if not rows:
+            return rows, set()
+
+        existing = set(
+            self.filter(name__in={name for name, _language in rows})
+            .order_by()
+            .values_list("name", "language")
+        )
+        self.bulk_create(
+            rows.values(),
+            update_conflicts=True,
+            unique_fields=["name", "language"],
+            update_fields=[
+                "category",
+                "status",
+                "template_id",
+                "components",
+                "rejection_reason",
+                "last_synced_at",
+                "updated_at",
+            ],
+        )
+        return rows, set(rows) - existing
 
 
 class WhatsAppTemplate(models.Model):
@@ -143,14 +220,34 @@ class WhatsAppTemplate(models.Model):
         null=True,
         help_text=_("Template components (header/body/footer/buttons) as returned by Meta")
     )
+    payload_hash = models.CharField(
+        _("Payload Hash"),
+        max_length=64,
+        blank=True,
+        default="",
+        help_text=_(
+            "SHA-256 of the payload last synced to Meta, used to skip unchanged "
+            "templates"
+        ),
+    )
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
+
+    objects = WhatsAppTemplateManager()
     
     class Meta:
         verbose_name = _("WhatsApp Template")
         verbose_name_plural = _("WhatsApp Templates")
         ordering = ["-created_at"]
         unique_together = [['name', 'language']]
+        indexes = [
+            # Admin changelist filtered by status, in the default newest-first order
+            models.Index(
+                fields=["status", "-created_at"], name="wat_status_created_idx"
+            ),
+            # Unfiltered changelist in the default ordering
+            models.Index(fields=["-created_at"], name="wat_created_at_desc"),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.language}) - {self.status}"
@@ -8,12 +8,16 @@ from rest_framework import serializers
 from decimal import Decimal
 from .models import WhatsAppConfig
 
+MIN_TOPUP_AMOUNT = Decimal("1.00")
+
 
 class PaynowTopUpRequestSerializer(serializers.Serializer):
     """Serializer for a Paynow top-up request."""
 
     amount = serializers.DecimalField(
-        max_digits=12, decimal_places=2, min_value=Decimal("1.00")
+        max_digits=12,
+        decimal_places=2,
+        min_value=MIN_TOPUP_AMOUNT,
     )
 
 
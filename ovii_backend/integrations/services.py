@@ -4,15 +4,26 @@ Date: 2024-05-21
 Description: Service layer for handling third-party integrations like EcoCash and WhatsApp.
 """
 
+import base64
 import hashlib
+import hmac
 import json
 import logging
+import socket
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
+from operator import itemgetter
+from urllib.parse import parse_qsl
 
 import requests
 from django.conf import settings
-from heyoo import WhatsApp
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+from .models import get_active_whatsapp_config
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +31,85 @@ logger = logging.getLogger(__name__)
 MAX_ERROR_MESSAGE_LENGTH = 500  # Maximum length for error message in logs/display
 MIN_TOKEN_LENGTH_FOR_MASKING = 14  # Minimum token length to apply masking
 
+# Connection pooling for outbound HTTP calls
+HTTP_POOL_SIZE = 10  # Keep-alive connections kept per host
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# TCP keepalive on pooled sockets, so NATs and load balancers don't silently
+# drop connections that sit idle between payments (the TCP_* knobs are Linux)
+HTTP_KEEPALIVE_SOCKET_OPTIONS = [
+    *HTTPConnection.default_socket_options,
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    *(
+        (socket.IPPROTO_TCP, getattr(socket, name), value)
+        for name, value in (
+            ("TCP_KEEPIDLE", 30),
+            ("TCP_KEEPINTVL", 10),
+            ("TCP_KEEPCNT", 3),
+        )
+        if hasattr(socket, name)
+    ),
+]
+
+# Bulk WhatsApp sends: workers stay below HTTP_POOL_SIZE so every send gets a
+# pooled connection, and request starts are spaced to stay under Meta's
+# per-number messaging throughput.
+BULK_SEND_MAX_WORKERS = 8
+BULK_SEND_RATE_PER_SECOND = 50
+
+# Paynow hashes the initiate-transaction fields in exactly this order
+PAYNOW_INITIATE_HASH_FIELDS = (
+    "id",
+    "reference",
+    "amount",
+    "additionalinfo",
+    "returnurl",
+    "resulturl",
+    "status",
+)
+_paynow_initiate_hash_values = itemgetter(*PAYNOW_INITIATE_HASH_FIELDS)
+PAYNOW_HASH_LENGTH = 128  # SHA512 as hex
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections send TCP keepalive probes."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTP_KEEPALIVE_SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _build_session() -> requests.Session:
+    """
+    Build a requests session that keeps connections alive between calls.
+
+    Idempotent requests (GET/HEAD) are retried with backoff on connection
+    errors, read errors and the statuses in HTTP_RETRY_STATUSES. POSTs are
+    only retried when the connection could not be established, i.e. the
+    request never reached the remote API. After the last retry the response
+    is returned as-is, so callers keep handling failures through
+    raise_for_status().
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=HTTP_RETRY_STATUSES,
+        raise_on_status=False,
+    )
+    adapter = _KeepAliveAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+
+# Shared by every client in this module so connections to EcoCash, Paynow
+# and the Graph API survive across client instances and requests.
+_SESSION = _build_session()
+
 
 class EcoCashClient:
     """
@@ -40,10 +130,11 @@ class EcoCashClient:
                 "EcoCash API credentials not configured. "
                 "Set ECOCASH_API_KEY and ECOCASH_API_SECRET."
             )
+        # Credentials are fixed per instance, so the headers are built once
+        self._auth_headers = self._get_auth_headers()
 
     def _get_auth_headers(self) -> dict:
         """Returns Basic Auth headers as required by the EcoCash merchant API."""
-        import base64
         raw = f"{self.api_key}:{self.api_secret}"
         encoded = base64.b64encode(raw.encode()).decode()
         return {
@@ -73,14 +164,14 @@ class EcoCashClient:
         """
         url = f"{self.api_base_url}/c2b/payment-requests"
         payload = {
-            "customerPhoneNumber": phone_number.replace("+", ""),
+            "customerPhoneNumber": phone_number.lstrip("+"),
             "amount": str(amount),
             "transactionReference": reference,
             "callbackUrl": settings.ECOCASH_WEBHOOK_URL,
         }
         try:
-            response = requests.post(
-                url, json=payload, headers=self._get_auth_headers(), timeout=15
+            response = _SESSION.post(
+                url, json=payload, headers=self._auth_headers, timeout=15
             )
             if not response.ok:
                 self._raise_for_ecocash_error(response, f"C2B payment ref={reference}")
@@ -101,14 +192,14 @@ class EcoCashClient:
         """
         url = f"{self.api_base_url}/b2c/payments"
         payload = {
-            "customerPhoneNumber": phone_number.replace("+", ""),
+            "customerPhoneNumber": phone_number.lstrip("+"),
             "amount": str(amount),
             "transactionReference": reference,
             "callbackUrl": settings.ECOCASH_WEBHOOK_URL,
         }
         try:
-            response = requests.post(
-                url, json=payload, headers=self._get_auth_headers(), timeout=20
+            response = _SESSION.post(
+                url, json=payload, headers=self._auth_headers, timeout=20
             )
             if not response.ok:
                 self._raise_for_ecocash_error(response, f"B2C payment ref={reference}")
@@ -129,6 +220,9 @@ class PaynowClient:
     def __init__(self):
         self.integration_id = settings.PAYNOW_INTEGRATION_ID
         self.integration_key = settings.PAYNOW_INTEGRATION_KEY
+        self._integration_key_bytes = (
+            self.integration_key.encode("utf-8") if self.integration_key else None
+        )
         base = settings.PAYNOW_API_URL.rstrip("/")
         # Normalise: always point to the correct Paynow initiate endpoint
         if base.endswith("/remotetransaction"):
@@ -136,10 +230,19 @@ class PaynowClient:
         else:
             self.initiate_transaction_url = f"{base}/remotetransaction"
 
-    def _generate_hash(self, values_string: str) -> str:
-        """Generates a SHA512 hash as required by Paynow."""
-        values_string += self.integration_key
-        return hashlib.sha512(values_string.encode("utf-8")).hexdigest().upper()
+    def _hash_values(self, values) -> str:
+        """
+        Generates the SHA512 hash Paynow expects over the concatenated values.
+        The values are streamed into the hasher rather than joined first.
+        """
+        if self._integration_key_bytes is None:
+            # Never sign or verify with an empty key; that would accept forged webhooks
+            raise Exception("Paynow integration key not configured.")
+        hasher = hashlib.sha512()
+        for value in values:
+            hasher.update(str(value).encode("utf-8"))
+        hasher.update(self._integration_key_bytes)
+        return hasher.hexdigest().upper()
 
     def create_transaction(
         self, reference: str, amount: Decimal, user_email: str
@@ -157,19 +260,15 @@ class PaynowClient:
             "status": "Message",
         }
 
-        # Create the concatenated string for hashing
-        hash_string = "".join(str(v) for v in payload.values())
-        payload["hash"] = self._generate_hash(hash_string)
+        payload["hash"] = self._hash_values(_paynow_initiate_hash_values(payload))
 
         try:
-            response = requests.post(
+            response = _SESSION.post(
                 self.initiate_transaction_url, data=payload, timeout=20
             )
             response.raise_for_status()
             # Paynow returns a URL-encoded string, so we need to parse it.
-            from urllib.parse import parse_qs
-
-            parsed_response = {k: v[0] for k, v in parse_qs(response.text).items()}
+            parsed_response = dict(parse_qsl(response.text))
 
             if parsed_response.get("status", "").lower() != "ok":
                 error_message = parsed_response.get(
@@ -191,75 +290,64 @@ class PaynowClient:
         The order of concatenation is critical and must match Paynow's documentation.
         """
         hash_to_verify = data.get("hash", "")
-        if not hash_to_verify:
+        # Reject malformed hashes before paying for the SHA512
+        if len(hash_to_verify) != PAYNOW_HASH_LENGTH:
             return False
 
-        # Create the concatenated string for hashing from the POST data, excluding the hash itself.
+        # Hash the POST data in order, excluding the hash itself.
         # The order of values is critical for the hash to be correct.
-        values_string = "".join(str(v) for k, v in data.items() if k.lower() != "hash")
-        expected_hash = self._generate_hash(values_string)
+        expected_hash = self._hash_values(
+            v for k, v in data.items() if k.lower() != "hash"
+        )
 
-        return hash_to_verify.upper() == expected_hash
+        # Constant-time comparison so the check doesn't leak how much matched
+        return hmac.compare_digest(
+            hash_to_verify.upper().encode("utf-8"), expected_hash.encode("utf-8")
+        )
 
 
 class WhatsAppClient:
     """
     A client for interacting with the WhatsApp Business Cloud API.
-    Uses the heyoo SDK for simplified API interactions.
+    Calls the Graph API directly over the module's pooled session.
     
     Credentials are loaded from:
     1. Database (WhatsAppConfig model) - preferred for runtime control
     2. Environment variables (.env) - fallback for backward compatibility
     """
 
-    def __init__(self):
-        # Try to load credentials from database first
-        self.phone_number_id = None
-        self.access_token = None
-        self.api_version = None
-        self.waba_id = None
-        
-        try:
-            from .models import WhatsAppConfig
-            config = WhatsAppConfig.objects.filter(is_active=True).first()
-            if config:
-                self.waba_id = config.waba_id if hasattr(config, 'waba_id') else None
-                self.phone_number_id = config.phone_number_id
-                self.access_token = config.access_token
-                self.api_version = config.api_version
-                logger.info("WhatsApp credentials loaded from database")
-        except ImportError:
-            # Models not available (e.g., during initial migrations)
-            logger.debug("WhatsAppConfig model not available")
-        except Exception as e:
-            # Database errors or other issues (e.g., OperationalError during migrations)
-            logger.debug(f"Could not load WhatsApp config from database: {type(e).__name__}")
-        
-        # Fallback to environment variables if not found in database
-        if not self.phone_number_id or not self.access_token:
-            self.waba_id = settings.WHATSAPP_WABA_ID
-            self.phone_number_id = settings.WHATSAPP_PHONE_NUMBER_ID
-            self.access_token = settings.WHATSAPP_ACCESS_TOKEN
-            self.api_version = settings.WHATSAPP_API_VERSION
-            if self.phone_number_id and self.access_token:
-                logger.info("WhatsApp credentials loaded from environment variables")
-        
+    def __init__(self, credentials=None):
+        # Pooled module session, so back-to-back clients reuse the TLS connection
+        self.session = _SESSION
+
+        self.credentials = credentials or _load_whatsapp_credentials()
+        (
+            self.waba_id,
+            self.phone_number_id,
+            self.access_token,
+            self.api_version,
+        ) = self.credentials
+        self._graph_headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json",
+        }
+        graph_base_url = f"https://graph.facebook.com/{self.api_version or 'v20.0'}"
+        self._messages_url = f"{graph_base_url}/{self.phone_number_id}/messages"
+        self._templates_url = f"{graph_base_url}/{self.waba_id}/message_templates"
+
         if not self.phone_number_id or not self.access_token:
             logger.warning(
                 "WhatsApp credentials not configured. "
                 "Configure in admin panel or set WHATSAPP_PHONE_NUMBER_ID and "
                 "WHATSAPP_ACCESS_TOKEN in settings."
             )
-            self.client = None
-        else:
-            self.client = WhatsApp(
-                token=self.access_token,
-                phone_number_id=self.phone_number_id
-            )
 
     def send_text_message(self, phone_number: str, message: str) -> dict:
         """
-        Sends a simple text message via WhatsApp.
+        Sends a simple text message via a direct Meta Graph API call.
+
+        Like send_template_message, this goes over the pooled session so
+        sends reuse the open connection.
         
         Args:
             phone_number: Recipient's phone number in international format (e.g., +263777123456)
@@ -271,19 +359,85 @@ class WhatsAppClient:
         Raises:
             Exception: If WhatsApp is not configured or message fails to send
         """
-        if not self.client:
+        if not self.phone_number_id or not self.access_token:
             raise Exception("WhatsApp client not configured. Check credentials.")
         
         try:
-            # Remove '+' if present for API call
-            clean_number = phone_number.replace("+", "")
-            response = self.client.send_message(message=message, recipient_id=clean_number)
+            result = self._post_text_message(phone_number, message)
             logger.info(f"WhatsApp message sent to {phone_number}")
-            return response
+            return result
         except Exception as e:
             logger.error(f"Failed to send WhatsApp message to {phone_number}: {e}")
             raise
 
+    def _post_text_message(self, phone_number: str, message: str) -> dict:
+        """POST a text message to the Graph messages endpoint; return the JSON reply."""
+        payload = {
+            "messaging_product": "whatsapp",
+            "recipient_type": "individual",
+            # Remove '+' if present for API call
+            "to": phone_number.lstrip("+"),
+            "type": "text",
+            "text": {"preview_url": True, "body": message},
+        }
+        response = self.session.post(
+            self._messages_url, json=payload, headers=self._graph_headers, timeout=15
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def send_bulk_messages(self, messages) -> list:
+        """
+        Sends many text messages concurrently over the pooled session.
+
+        At most BULK_SEND_MAX_WORKERS requests are in flight, and request
+        starts are spaced to BULK_SEND_RATE_PER_SECOND. A failed recipient
+        does not stop the rest; the run is logged as a single summary line.
+
+        Args:
+            messages: Iterable of (phone_number, message) tuples
+
+        Returns:
+            list: One (phone_number, result) pair per input message, in input
+                order, so a recipient listed twice gets two entries. Each
+                result is {"ok": bool, "response": dict or None, "error": str or None}
+
+        Raises:
+            Exception: If WhatsApp is not configured
+        """
+        if not self.phone_number_id or not self.access_token:
+            raise Exception("WhatsApp client not configured. Check credentials.")
+
+        def send(phone_number, message):
+            try:
+                response = self._post_text_message(phone_number, message)
+            except Exception as e:
+                return {"ok": False, "response": None, "error": str(e)}
+            return {"ok": True, "response": response, "error": None}
+
+        interval = 1 / BULK_SEND_RATE_PER_SECOND
+        futures = []
+        with ThreadPoolExecutor(max_workers=BULK_SEND_MAX_WORKERS) as executor:
+            next_start = time.monotonic()
+            for phone_number, message in messages:
+                wait = next_start - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                next_start = max(next_start, time.monotonic()) + interval
+                future = executor.submit(send, phone_number, message)
+                futures.append((phone_number, future))
+
+        results = [(phone_number, future.result()) for phone_number, future in futures]
+        failed = [phone_number for phone_number, result in results if not result["ok"]]
+        logger.info(
+            "WhatsApp bulk send: %d sent, %d failed",
+            len(results) - len(failed),
+            len(failed),
+        )
+        if failed:
+            logger.warning("WhatsApp bulk send failed for: %s", ", ".join(failed))
+        return results
+
     def send_template_message(
         self,
         phone_number: str,
@@ -294,7 +448,7 @@ class WhatsAppClient:
         """
         Sends a pre-approved WhatsApp template message via direct Meta Graph API call.
 
-        Uses the Graph API directly (not heyoo) to ensure correct component formatting
+        Uses the Graph API directly to ensure correct component formatting
         and compatibility with the latest Meta Cloud API.
 
         Args:
@@ -315,16 +469,9 @@ class WhatsAppClient:
         from integrations.whatsapp_templates import normalize_language_code
 
         normalized_lang = normalize_language_code(language_code)
-        clean_number = phone_number.replace("+", "")
+        clean_number = phone_number.lstrip("+")
 
-        url = (
-            f"https://graph.facebook.com/{self.api_version or 'v20.0'}"
-            f"/{self.phone_number_id}/messages"
-        )
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json",
-        }
+        url = self._messages_url
         payload = {
             "messaging_product": "whatsapp",
             "to": clean_number,
@@ -337,7 +484,9 @@ class WhatsAppClient:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=15)
+            response = self.session.post(
+                url, json=payload, headers=self._graph_headers, timeout=15
+            )
             response.raise_for_status()
             result = response.json()
             logger.info(f"WhatsApp template '{template_name}' sent to {phone_number}")
@@ -388,6 +537,35 @@ class WhatsAppClient:
         
         return exception
 
+    def _wrap_request_error(
+        self, error: Exception, template_name: str, url: str
+    ) -> Exception:
+        """
+        Convert a transport-level requests error from create_template into a
+        structured API exception.
+
+        ConnectionError is checked before Timeout so ConnectTimeout (a subclass
+        of both) keeps being reported as a connection error.
+        """
+        if isinstance(error, requests.exceptions.ConnectionError):
+            error_type = "ConnectionError"
+            error_msg = f"Network connection error: {error}"
+        elif isinstance(error, requests.exceptions.Timeout):
+            error_type = "Timeout"
+            error_msg = f"Request timeout after 30 seconds: {error}"
+        else:
+            error_type = type(error).__name__
+            error_msg = f"Request error: {error}"
+
+        logger.error("Failed to create template '%s': %s", template_name, error_msg)
+        logger.debug("Request error details: %s - %s", type(error).__name__, error)
+        logger.debug("Request URL was: %s", url)
+        return self._create_api_exception(
+            error_msg,
+            error_type=error_type,
+            additional_attrs={'template_name': template_name, 'request_url': url}
+        )
+
     def create_template(self, template_data: dict) -> dict:
         """
         Creates a WhatsApp message template in Meta via Graph API.
@@ -425,26 +603,29 @@ class WhatsAppClient:
         if not template_data.get('components'):
             raise ValueError("Template components are required")
         
-        url = f"https://graph.facebook.com/{self.api_version}/{self.waba_id}/message_templates"
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json"
-        }
+        url = self._templates_url
         
         try:
             # Log the request for debugging (mask token for security)
-            masked_token = (
-                self.access_token[:10] + "..." + self.access_token[-4:] 
-                if self.access_token and len(self.access_token) > MIN_TOKEN_LENGTH_FOR_MASKING 
-                else "***"
-            )
-            logger.debug(f"Creating template '{template_name}'")
-            logger.debug(f"Request URL: {url}")
-            logger.debug(f"Request headers: Authorization: Bearer {masked_token}, Content-Type: application/json")
-            logger.debug(f"Request payload: {json.dumps(template_data, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                masked_token = (
+                    self.access_token[:10] + "..." + self.access_token[-4:]
+                    if len(self.access_token) > MIN_TOKEN_LENGTH_FOR_MASKING
+                    else "***"
+                )
+                logger.debug("Creating template '%s'", template_name)
+                logger.debug("Request URL: %s", url)
+                logger.debug(
+                    "Request headers: Authorization: Bearer %s, "
+                    "Content-Type: application/json",
+                    masked_token,
+                )
+                logger.debug("Request payload: %s", json.dumps(template_data, indent=2))
             
             # Make the API call
-            response = requests.post(url, json=template_data, headers=headers, timeout=30)
+            response = self.session.post(
+                url, json=template_data, headers=self._graph_headers, timeout=30
+            )
             
             # Log response status and body BEFORE raise_for_status
             # This ensures we capture the response even if it's an error
@@ -455,8 +636,8 @@ class WhatsAppClient:
                 logger.error(f"Response status code: {status_code}")
                 logger.error(f"Response headers: {dict(response.headers)}")
             else:
-                logger.debug(f"Response status code: {status_code}")
-                logger.debug(f"Response headers: {dict(response.headers)}")
+                logger.debug("Response status code: %s", status_code)
+                logger.debug("Response headers: %s", response.headers)
             
             # Safely get response text
             try:
@@ -465,7 +646,7 @@ class WhatsAppClient:
                     # For errors, log the full response at ERROR level
                     logger.error(f"Response body: {response_text}")
                 else:
-                    logger.debug(f"Response body: {response_text}")
+                    logger.debug("Response body: %s", response_text)
             except Exception as text_err:
                 logger.warning(f"Could not read response text: {text_err}")
                 response_text = None
@@ -475,8 +656,8 @@ class WhatsAppClient:
             
             # Parse successful response
             result = response.json()
-            logger.info(f"Template '{template_name}' created successfully in Meta")
-            logger.debug(f"Response data: {result}")
+            logger.info("Template '%s' created successfully in Meta", template_name)
+            logger.debug("Response data: %s", result)
             return result
         except requests.exceptions.HTTPError as e:
             # Extract error details from response
@@ -484,12 +665,14 @@ class WhatsAppClient:
             response_obj = getattr(e, 'response', None)
             
             # Extract basic response info first (before any JSON parsing)
-            status_code = getattr(response_obj, 'status_code', None) if response_obj else None
+            status_code = (
+                response_obj.status_code if response_obj is not None else None
+            )
             response_text = None
             response_headers = {}
             
             # Safely get response text and headers
-            if response_obj:
+            if response_obj is not None:
                 try:
                     response_text = response_obj.text
                     response_headers = dict(response_obj.headers)
@@ -520,15 +703,23 @@ class WhatsAppClient:
             else:
                 logger.error(f"Raw response: None (no response body available)")
             
-            # Try to parse JSON response
-            if response_obj and response_text:
+            # Try to parse JSON response (from the text already decoded above)
+            if response_obj is not None and response_text:
                 try:
-                    error_data = response_obj.json()
-                    logger.debug(f"Parsed error response JSON: {json.dumps(error_data, indent=2)}")
+                    error_data = json.loads(response_text)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "Parsed error response JSON: %s",
+                            json.dumps(error_data, indent=2),
+                        )
                 except (json.JSONDecodeError, ValueError, TypeError) as json_err:
                     json_parse_error = str(json_err)
                     logger.warning(f"Failed to parse error response as JSON: {json_parse_error}")
-                    logger.debug(f"Raw response text (length={len(response_text)}): {response_text[:500]}")
+                    logger.debug(
+                        "Raw response text (length=%d): %s",
+                        len(response_text),
+                        response_text[:500],
+                    )
                     
                     # Check if response looks like HTML
                     is_html = response_text.strip().startswith('<') or 'text/html' in content_type.lower()
@@ -537,7 +728,7 @@ class WhatsAppClient:
                     
                     # Use raw text as fallback - store in error.message structure for consistency
                     error_data = {"error": {"message": response_text[:MAX_ERROR_MESSAGE_LENGTH]}}
-            elif not response_obj:
+            elif response_obj is None:
                 # No response object available at all
                 logger.error("No response object available in HTTPError exception")
                 error_data = {"error": {"message": str(e)}}
@@ -550,7 +741,15 @@ class WhatsAppClient:
             error_obj = error_data.get("error", {}) if isinstance(error_data, dict) else {}
             
             # Log the error_obj structure for debugging
-            logger.debug(f"Error object structure: {json.dumps(error_obj, indent=2) if isinstance(error_obj, dict) else str(error_obj)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Error object structure: %s",
+                    (
+                        json.dumps(error_obj, indent=2)
+                        if isinstance(error_obj, dict)
+                        else error_obj
+                    ),
+                )
             
             # Extract error code with fallbacks
             error_code = None
@@ -585,33 +784,41 @@ class WhatsAppClient:
             error_user_msg = error_obj.get("error_user_msg") if isinstance(error_obj, dict) else None
             fbtrace_id = error_obj.get("fbtrace_id") if isinstance(error_obj, dict) else None
             
-            # Build detailed error log
-            error_details = [
-                f"Template: '{template_name}'",
-                f"HTTP Status: {status_code}",
-                f"Error Code: {error_code}",
-                f"Error Type: {error_type}",
-                f"Error Subcode: {error_subcode}",
-                f"Message: {error_message}",
-            ]
-            
-            if error_user_title:
-                error_details.append(f"User Title: {error_user_title}")
-            if error_user_msg:
-                error_details.append(f"User Message: {error_user_msg}")
-            if fbtrace_id:
-                error_details.append(f"FB Trace ID: {fbtrace_id}")
-            if json_parse_error:
-                error_details.append(f"JSON Parse Error: {json_parse_error}")
-            
             # Log detailed error
-            logger.error("Failed to create WhatsApp template:\n  " + "\n  ".join(error_details))
+            logger.error(
+                "Failed to create WhatsApp template:\n"
+                "  Template: '%s'\n"
+                "  HTTP Status: %s\n"
+                "  Error Code: %s\n"
+                "  Error Type: %s\n"
+                "  Error Subcode: %s\n"
+                "  Message: %s\n"
+                "  User Title: %s\n"
+                "  User Message: %s\n"
+                "  FB Trace ID: %s\n"
+                "  JSON Parse Error: %s",
+                template_name,
+                status_code,
+                error_code,
+                error_type,
+                error_subcode,
+                error_message,
+                error_user_title,
+                error_user_msg,
+                fbtrace_id,
+                json_parse_error,
+            )
             
             # Log the full error response for debugging (only in debug mode)
-            logger.debug(f"Full error response: {json.dumps(error_data, indent=2) if isinstance(error_data, dict) else str(error_data)}")
-            
-            # Log the request payload that failed (only in debug mode)
-            logger.debug(f"Failed request payload: {json.dumps(template_data, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Full error response: %s",
+                    (
+                        json.dumps(error_data, indent=2)
+                        if isinstance(error_data, dict)
+                        else error_data
+                    ),
+                )
             
             # Create structured exception with all available data
             additional_attrs = {
@@ -639,50 +846,17 @@ class WhatsAppClient:
             )
             
             raise exception
-        except requests.exceptions.ConnectionError as e:
-            # Network connection error
-            error_msg = f"Network connection error: {str(e)}"
-            logger.error(f"Failed to create template '{template_name}': {error_msg}")
-            logger.debug(f"Connection error details: {type(e).__name__} - {str(e)}")
-            logger.debug(f"Request URL was: {url}")
-            logger.debug(f"Template payload: {json.dumps(template_data, indent=2)}")
-            raise self._create_api_exception(
-                error_msg, 
-                error_type="ConnectionError",
-                additional_attrs={'template_name': template_name, 'request_url': url}
-            )
-        except requests.exceptions.Timeout as e:
-            # Request timeout
-            error_msg = f"Request timeout after 30 seconds: {str(e)}"
-            logger.error(f"Failed to create template '{template_name}': {error_msg}")
-            logger.debug(f"Timeout details: {type(e).__name__} - {str(e)}")
-            logger.debug(f"Request URL was: {url}")
-            logger.debug(f"Template payload: {json.dumps(template_data, indent=2)}")
-            raise self._create_api_exception(
-                error_msg, 
-                error_type="Timeout",
-                additional_attrs={'template_name': template_name, 'request_url': url}
-            )
         except requests.exceptions.RequestException as e:
-            # Other request-related errors (not HTTPError, ConnectionError, or Timeout)
-            error_msg = f"Request error: {str(e)}"
-            logger.error(f"Failed to create template '{template_name}': {error_msg}")
-            logger.debug(f"Request error details: {type(e).__name__} - {str(e)}")
-            logger.debug(f"Request URL was: {url}")
-            logger.debug(f"Template payload: {json.dumps(template_data, indent=2)}")
-            raise self._create_api_exception(
-                error_msg, 
-                error_type=type(e).__name__,
-                additional_attrs={'template_name': template_name, 'request_url': url}
-            )
+            # Connection errors, timeouts and other transport failures
+            raise self._wrap_request_error(e, template_name, url)
         except Exception as e:
             # Catch-all for unexpected errors
             error_msg = f"Unexpected error: {str(e)}"
             logger.error(f"Failed to create template '{template_name}': {error_msg}")
             logger.error(f"Exception type: {type(e).__name__}, Details: {str(e)}")
-            logger.debug(f"Request URL was: {url}")
-            logger.debug(f"Template payload: {json.dumps(template_data, indent=2)}")
-            logger.debug(f"Full traceback: {traceback.format_exc()}")
+            logger.debug("Request URL was: %s", url)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Full traceback: %s", traceback.format_exc())
             raise self._create_api_exception(
                 error_msg, 
                 error_type=type(e).__name__,
@@ -720,8 +894,7 @@ class WhatsAppClient:
                 "quality_score,rejected_reason"
             )
 
-        url = f"https://graph.facebook.com/{self.api_version or 'v20.0'}/{self.waba_id}/message_templates"
-        headers = {"Authorization": f"Bearer {self.access_token}"}
+        url = self._templates_url
         params = {"fields": fields, "limit": limit}
 
         templates = []
@@ -729,7 +902,9 @@ class WhatsAppClient:
         try:
             while url:
                 logger.debug(f"Fetching templates page {page} from Meta")
-                response = requests.get(url, headers=headers, params=params, timeout=30)
+                response = self.session.get(
+                    url, headers=self._graph_headers, params=params, timeout=30
+                )
                 response.raise_for_status()
                 data = response.json()
 
@@ -777,27 +952,26 @@ class WhatsAppClient:
         if not self.access_token:
             raise Exception("WhatsApp access token not configured.")
         
-        url = f"https://graph.facebook.com/{self.api_version}/{self.waba_id}/message_templates"
-        headers = {
-            "Authorization": f"Bearer {self.access_token}"
-        }
+        url = self._templates_url
         params = {
             "name": template_name
         }
         
         try:
-            logger.debug(f"Checking template status for '{template_name}'")
-            logger.debug(f"Request URL: {url}")
-            logger.debug(f"Request params: {params}")
+            logger.debug("Checking template status for '%s'", template_name)
+            logger.debug("Request URL: %s", url)
+            logger.debug("Request params: %s", params)
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = self.session.get(
+                url, headers=self._graph_headers, params=params, timeout=30
+            )
             
             # Log response details
-            logger.debug(f"Response status code: {response.status_code}")
+            logger.debug("Response status code: %s", response.status_code)
             
             response.raise_for_status()
             result = response.json()
-            logger.debug(f"Template status response: {result}")
+            logger.debug("Template status response: %s", result)
             return result
         except requests.exceptions.HTTPError as e:
             status_code = e.response.status_code if e.response is not None else None
@@ -811,14 +985,63 @@ class WhatsAppClient:
                 error_message = response_text or str(e)
             
             logger.error(f"Failed to get template status for '{template_name}': HTTP {status_code} - {error_message}")
-            logger.debug(f"Response text: {response_text}")
+            logger.debug("Response text: %s", response_text)
             raise Exception(f"Meta API error (HTTP {status_code}): {error_message}")
         except requests.exceptions.RequestException as e:
             error_msg = f"Request error: {str(e)}"
             logger.error(f"Failed to get template status for '{template_name}': {error_msg}")
-            logger.debug(f"Error type: {type(e).__name__}")
+            logger.debug("Error type: %s", type(e).__name__)
             raise Exception(error_msg)
         except Exception as e:
             logger.error(f"Failed to get template status for '{template_name}': {e}")
-            logger.debug(f"Exception type: {type(e).__name__}, Details: {str(e)}")
+            logger.debug("Exception type: %s, Details: %s", type(e).__name__, e)
             raise
+
+
+def _load_whatsapp_credentials() -> tuple:
+    """
+    Resolve (waba_id, phone_number_id, access_token, api_version).
+
+    The active WhatsAppConfig wins; the WHATSAPP_* settings are the fallback.
+    """
+    try:
+        config = get_active_whatsapp_config()
+        if config and config.phone_number_id and config.access_token:
+            logger.info("WhatsApp credentials loaded from database")
+            return (
+                config.waba_id,
+                config.phone_number_id,
+                config.access_token,
+                config.api_version,
+            )
+    except Exception as e:
+        # Database errors or other issues (e.g., OperationalError during migrations)
+        logger.debug(f"Could not load WhatsApp config from database: {type(e).__name__}")
+
+    # Fallback to environment variables if not found in database
+    if settings.WHATSAPP_PHONE_NUMBER_ID and settings.WHATSAPP_ACCESS_TOKEN:
+        logger.info("WhatsApp credentials loaded from environment variables")
+    return (
+        settings.WHATSAPP_WABA_ID,
+        settings.WHATSAPP_PHONE_NUMBER_ID,
+        settings.WHATSAPP_ACCESS_TOKEN,
+        settings.WHATSAPP_API_VERSION,
+    )
+
+
+_whatsapp_client = None
+
+
+def get_whatsapp_client() -> "WhatsAppClient":
+    """
+    Return a WhatsAppClient shared by the process.
+
+    The instance is rebuilt only when the resolved credentials change, so a
+    token rotated in the admin is picked up without building a new client
+    (headers and Graph URLs) on every message.
+    """
+    global _whatsapp_client
+    credentials = _load_whatsapp_credentials()
+    if _whatsapp_client is None or _whatsapp_client.credentials != credentials:
+        _whatsapp_client = WhatsAppClient(credentials)
+    return _whatsapp_client
@@ -4,23 +4,35 @@ Date: 2024-12-09
 Description: Tests for integrations app including WhatsApp functionality.
 """
 
-from django.test import TestCase
+from django.core.cache import caches
+from django.test import TestCase, override_settings
 from unittest.mock import patch, MagicMock
-from .services import WhatsAppClient
+from .services import PaynowClient, WhatsAppClient
 from .whatsapp_templates import get_template_structure, format_template_components
-from .models import WhatsAppConfig
+from .models import ACTIVE_CONFIG_CACHE_ALIAS, WhatsAppConfig
 
+# Keep the Redis-backed "shared" cache in process so the tests don't need Redis
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "shared",
+    },
+}
 
+
+@override_settings(CACHES=LOCMEM_CACHES)
 class WhatsAppClientTestCase(TestCase):
     """Test cases for WhatsApp Cloud API client."""
 
     def setUp(self):
         """Set up test fixtures."""
+        # The active config is cached; DB rollbacks between tests don't clear it
+        caches[ACTIVE_CONFIG_CACHE_ALIAS].clear()
         self.phone_number = "+263777123456"
         self.message = "Test message"
 
-    @patch('integrations.services.WhatsApp')
-    def test_whatsapp_client_initialization_from_database(self, mock_whatsapp):
+    def test_whatsapp_client_initialization_from_database(self):
         """Test WhatsApp client initialization with credentials from database."""
         # Create a WhatsApp config in the database
         WhatsAppConfig.objects.create(
@@ -32,17 +44,11 @@ class WhatsAppClientTestCase(TestCase):
         
         client = WhatsAppClient()
         
-        self.assertIsNotNone(client.client)
         self.assertEqual(client.phone_number_id, "test_db_phone_id")
         self.assertEqual(client.access_token, "test_db_token")
-        mock_whatsapp.assert_called_once_with(
-            token="test_db_token",
-            phone_number_id="test_db_phone_id"
-        )
 
     @patch('integrations.services.settings')
-    @patch('integrations.services.WhatsApp')
-    def test_whatsapp_client_initialization_from_env(self, mock_whatsapp, mock_settings):
+    def test_whatsapp_client_initialization_from_env(self, mock_settings):
         """Test WhatsApp client initialization with credentials from environment variables."""
         mock_settings.WHATSAPP_PHONE_NUMBER_ID = "test_env_phone_id"
         mock_settings.WHATSAPP_ACCESS_TOKEN = "test_env_token"
@@ -50,16 +56,10 @@ class WhatsAppClientTestCase(TestCase):
         
         client = WhatsAppClient()
         
-        self.assertIsNotNone(client.client)
         self.assertEqual(client.phone_number_id, "test_env_phone_id")
         self.assertEqual(client.access_token, "test_env_token")
-        mock_whatsapp.assert_called_once_with(
-            token="test_env_token",
-            phone_number_id="test_env_phone_id"
-        )
 
-    @patch('integrations.services.WhatsApp')
-    def test_whatsapp_client_database_precedence(self, mock_whatsapp):
+    def test_whatsapp_client_database_precedence(self):
         """Test that database credentials take precedence over environment variables."""
         # Create a WhatsApp config in the database
         WhatsAppConfig.objects.create(
@@ -90,10 +90,34 @@ class WhatsAppClientTestCase(TestCase):
         
         client = WhatsAppClient()
         
-        self.assertIsNone(client.client)
+        with self.assertRaises(Exception) as context:
+            client.send_text_message(self.phone_number, self.message)
+        self.assertIn("not configured", str(context.exception))
 
-    @patch('integrations.services.WhatsApp')
-    def test_send_text_message(self, mock_whatsapp):
+    @patch('integrations.services._whatsapp_client', None)
+    def test_get_whatsapp_client_reused_until_credentials_change(self):
+        """Test that the shared client is rebuilt only when credentials change."""
+        from .services import get_whatsapp_client
+
+        config = WhatsAppConfig.objects.create(
+            phone_number_id="test_phone_id",
+            access_token="test_token",
+            is_active=True
+        )
+
+        client = get_whatsapp_client()
+        self.assertIs(get_whatsapp_client(), client)
+
+        config.access_token = "rotated_token"
+        with self.captureOnCommitCallbacks(execute=True):
+            config.save()
+
+        rotated = get_whatsapp_client()
+        self.assertIsNot(rotated, client)
+        self.assertEqual(rotated.access_token, "rotated_token")
+
+    @patch('integrations.services.requests.Session.post')
+    def test_send_text_message(self, mock_post):
         """Test sending a text message via WhatsApp."""
         # Create a WhatsApp config in the database
         WhatsAppConfig.objects.create(
@@ -103,21 +127,20 @@ class WhatsAppClientTestCase(TestCase):
             is_active=True
         )
         
-        mock_client_instance = MagicMock()
-        mock_whatsapp.return_value = mock_client_instance
-        mock_client_instance.send_message.return_value = {"messages": [{"id": "msg_123"}]}
+        mock_post.return_value.json.return_value = {"messages": [{"id": "msg_123"}]}
         
         client = WhatsAppClient()
         response = client.send_text_message(self.phone_number, self.message)
         
-        mock_client_instance.send_message.assert_called_once_with(
-            message=self.message,
-            recipient_id="263777123456"  # Without the +
-        )
+        url = mock_post.call_args[0][0]
+        payload = mock_post.call_args.kwargs["json"]
+        self.assertEqual(url, "https://graph.facebook.com/v18.0/test_phone_id/messages")
+        self.assertEqual(payload["to"], "263777123456")  # Without the +
+        self.assertEqual(payload["text"]["body"], self.message)
         self.assertIn("messages", response)
 
-    @patch('integrations.services.WhatsApp')
-    def test_send_template_message(self, mock_whatsapp):
+    @patch('integrations.services.requests.Session.post')
+    def test_send_template_message(self, mock_post):
         """Test sending a template message via WhatsApp."""
         # Create a WhatsApp config in the database
         WhatsAppConfig.objects.create(
@@ -127,9 +150,7 @@ class WhatsAppClientTestCase(TestCase):
             is_active=True
         )
         
-        mock_client_instance = MagicMock()
-        mock_whatsapp.return_value = mock_client_instance
-        mock_client_instance.send_template.return_value = {"messages": [{"id": "msg_456"}]}
+        mock_post.return_value.json.return_value = {"messages": [{"id": "msg_456"}]}
         
         client = WhatsAppClient()
         components = [{"type": "body", "parameters": [{"type": "text", "text": "123456"}]}]
@@ -139,10 +160,59 @@ class WhatsAppClientTestCase(TestCase):
             components=components
         )
         
-        mock_client_instance.send_template.assert_called_once()
+        payload = mock_post.call_args.kwargs["json"]
+        self.assertEqual(payload["template"]["name"], "otp_verification")
+        self.assertEqual(payload["template"]["components"], components)
         self.assertIn("messages", response)
 
 
+    @patch('integrations.services.BULK_SEND_RATE_PER_SECOND', 1000)
+    @patch('integrations.services.requests.Session.post')
+    def test_send_bulk_messages(self, mock_post):
+        """Test that a bulk send reports each recipient and survives failures."""
+        import requests
+
+        WhatsAppConfig.objects.create(
+            phone_number_id="test_phone_id",
+            access_token="test_token",
+            api_version="v18.0",
+            is_active=True
+        )
+
+        def post(url, json, **kwargs):
+            response = MagicMock()
+            if json["to"] == "263777000002":
+                response.raise_for_status.side_effect = (
+                    requests.exceptions.HTTPError("400")
+                )
+            response.json.return_value = {"messages": [{"id": f"msg_{json['to']}"}]}
+            return response
+
+        mock_post.side_effect = post
+
+        client = WhatsAppClient()
+        results = client.send_bulk_messages([
+            ("+263777000001", "Hello"),
+            ("+263777000002", "Hello"),
+            ("+263777000003", "Hello"),
+            ("+263777000001", "Again"),
+        ])
+
+        self.assertEqual(mock_post.call_count, 4)
+        self.assertEqual(
+            [phone for phone, _ in results],
+            ["+263777000001", "+263777000002", "+263777000003", "+263777000001"],
+        )
+        self.assertTrue(results[0][1]["ok"])
+        self.assertTrue(results[3][1]["ok"])
+        self.assertEqual(
+            results[2][1]["response"], {"messages": [{"id": "msg_263777000003"}]}
+        )
+        self.assertFalse(results[1][1]["ok"])
+        self.assertEqual(results[1][1]["error"], "400")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
 class WhatsAppConfigModelTestCase(TestCase):
     """Test cases for WhatsAppConfig model."""
 
@@ -182,6 +252,25 @@ class WhatsAppConfigModelTestCase(TestCase):
         with self.assertRaises(Exception):  # ValidationError is raised
             config2.save()
 
+    def test_second_active_config_fails_model_validation(self):
+        """Test that full_clean, used by admin forms, reports a second active config."""
+        from django.core.exceptions import ValidationError
+
+        WhatsAppConfig.objects.create(
+            phone_number_id="test_phone_id_1",
+            access_token="test_token_1",
+            is_active=True
+        )
+        config2 = WhatsAppConfig(
+            phone_number_id="test_phone_id_2",
+            access_token="test_token_2",
+            is_active=True
+        )
+
+        with self.assertRaises(ValidationError) as context:
+            config2.full_clean()
+        self.assertIn("Only one WhatsApp configuration", str(context.exception))
+
     def test_multiple_inactive_configs(self):
         """Test that multiple inactive configurations are allowed."""
         WhatsAppConfig.objects.create(
@@ -200,6 +289,33 @@ class WhatsAppConfigModelTestCase(TestCase):
         
         self.assertEqual(WhatsAppConfig.objects.filter(is_active=False).count(), 2)
 
+    def test_active_config_lookup_is_cached_and_invalidated(self):
+        """Test that the active config is read once and refreshed after a save."""
+        from .models import get_active_whatsapp_config
+
+        caches[ACTIVE_CONFIG_CACHE_ALIAS].clear()
+        config = WhatsAppConfig.objects.create(
+            phone_number_id="test_phone_id",
+            access_token="test_token",
+            is_active=True
+        )
+
+        self.assertEqual(get_active_whatsapp_config(), config)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_active_whatsapp_config(), config)
+
+        config.access_token = "rotated_token"
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            config.save()
+            # Not dropped until the transaction commits
+            self.assertEqual(get_active_whatsapp_config().access_token, "test_token")
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(get_active_whatsapp_config().access_token, "rotated_token")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            config.delete()
+        self.assertIsNone(get_active_whatsapp_config())
+
     def test_config_string_representation(self):
         """Test the string representation of WhatsAppConfig."""
         config = WhatsAppConfig.objects.create(
@@ -230,6 +346,31 @@ class WhatsAppTemplatesTestCase(TestCase):
         
         self.assertIsNone(template)
 
+    def test_get_all_templates_is_shared_and_read_only(self):
+        """Test that the template catalog is a single read-only mapping."""
+        from .whatsapp_templates import get_all_templates
+
+        templates = get_all_templates()
+
+        self.assertIs(templates, get_all_templates())
+        self.assertIn("otp_verification", templates)
+        with self.assertRaises(TypeError):
+            templates["otp_verification"] = {}
+
+    def test_display_only_lists_every_template(self):
+        """Test that --display-only prints each template and the total."""
+        from io import StringIO
+        from django.core.management import call_command
+        from .whatsapp_templates import get_all_templates
+
+        out = StringIO()
+        call_command('sync_whatsapp_templates', '--display-only', stdout=out)
+
+        output = out.getvalue()
+        for name in get_all_templates():
+            self.assertIn(f"Template: {name}", output)
+        self.assertIn(f"Total templates: {len(get_all_templates())}", output)
+
     def test_format_template_components(self):
         """
         Test formatting template components for OTP template with URL button fallback.
@@ -277,18 +418,20 @@ class WhatsAppTemplatesTestCase(TestCase):
             format_template_components("invalid_template", {})
 
 
+@override_settings(CACHES=LOCMEM_CACHES)
 class WhatsAppTemplateSyncTestCase(TestCase):
     """Test cases for WhatsApp template sync functionality."""
 
     def setUp(self):
         """Set up test fixtures."""
+        # The active config is cached; DB rollbacks between tests don't clear it
+        caches[ACTIVE_CONFIG_CACHE_ALIAS].clear()
         from .models import WhatsAppTemplate
         self.waba_id = "123456789"
         self.access_token = "test_token"
         self.template_name = "otp_verification"
 
-    @patch('integrations.services.WhatsApp')
-    def test_whatsapp_client_loads_waba_id_from_database(self, mock_whatsapp):
+    def test_whatsapp_client_loads_waba_id_from_database(self):
         """Test WhatsApp client loads WABA_ID from database."""
         WhatsAppConfig.objects.create(
             waba_id=self.waba_id,
@@ -303,9 +446,8 @@ class WhatsAppTemplateSyncTestCase(TestCase):
         self.assertEqual(client.waba_id, self.waba_id)
         self.assertEqual(client.access_token, self.access_token)
 
-    @patch('integrations.services.requests.post')
-    @patch('integrations.services.WhatsApp')
-    def test_create_template_success(self, mock_whatsapp, mock_post):
+    @patch('integrations.services.requests.Session.post')
+    def test_create_template_success(self, mock_post):
         """Test successful template creation via Meta API."""
         # Setup
         WhatsAppConfig.objects.create(
@@ -345,8 +487,7 @@ class WhatsAppTemplateSyncTestCase(TestCase):
         self.assertIn(self.waba_id, call_args[0][0])
         self.assertIn("message_templates", call_args[0][0])
 
-    @patch('integrations.services.WhatsApp')
-    def test_create_template_no_waba_id(self, mock_whatsapp):
+    def test_create_template_no_waba_id(self):
         """Test template creation fails without WABA_ID."""
         WhatsAppConfig.objects.create(
             waba_id="",
@@ -364,9 +505,8 @@ class WhatsAppTemplateSyncTestCase(TestCase):
         
         self.assertIn("WABA_ID not configured", str(context.exception))
 
-    @patch('integrations.services.requests.post')
-    @patch('integrations.services.WhatsApp')
-    def test_create_template_api_error(self, mock_whatsapp, mock_post):
+    @patch('integrations.services.requests.Session.post')
+    def test_create_template_api_error(self, mock_post):
         """Test template creation handles API errors."""
         WhatsAppConfig.objects.create(
             waba_id=self.waba_id,
@@ -387,9 +527,81 @@ class WhatsAppTemplateSyncTestCase(TestCase):
         with self.assertRaises(Exception):
             client.create_template(template_data)
 
-    @patch('integrations.services.requests.get')
-    @patch('integrations.services.WhatsApp')
-    def test_get_template_status(self, mock_whatsapp, mock_get):
+    @patch('integrations.services.requests.Session.post')
+    def test_create_template_parses_http_error_body(self, mock_post):
+        """Test a real 4xx response is parsed, since an error Response is falsy."""
+        import json
+        import requests
+
+        WhatsAppConfig.objects.create(
+            waba_id=self.waba_id,
+            phone_number_id="test_phone_id",
+            access_token=self.access_token,
+            api_version="v18.0",
+            is_active=True
+        )
+
+        response = requests.Response()
+        response.status_code = 400
+        response.url = "https://graph.facebook.com/v18.0/templates"
+        response.headers["Content-Type"] = "application/json"
+        response._content = json.dumps({
+            "error": {
+                "message": "Template name already exists",
+                "type": "OAuthException",
+                "code": 100,
+            }
+        }).encode()
+        mock_post.return_value = response
+
+        client = WhatsAppClient()
+        template_data = {
+            "name": "test_template",
+            "category": "UTILITY",
+            "language": "en_US",
+            "components": [{"type": "BODY", "text": "Test message"}]
+        }
+
+        with self.assertRaises(Exception) as context:
+            client.create_template(template_data)
+        self.assertEqual(context.exception.status_code, 400)
+        self.assertEqual(context.exception.error_code, 100)
+        self.assertEqual(context.exception.error_type, "OAuthException")
+        self.assertTrue(context.exception.is_duplicate)
+
+    @patch('integrations.services.requests.Session.post')
+    def test_create_template_transport_errors(self, mock_post):
+        """Test transport failures are reported with their error type."""
+        import requests
+
+        WhatsAppConfig.objects.create(
+            waba_id=self.waba_id,
+            phone_number_id="test_phone_id",
+            access_token=self.access_token,
+            api_version="v18.0",
+            is_active=True
+        )
+        client = WhatsAppClient()
+        template_data = {
+            "name": "test_template",
+            "category": "AUTHENTICATION",
+            "language": "en_US",
+            "components": [{"type": "BODY", "text": "Test message"}]
+        }
+
+        for error, error_type in [
+            (requests.exceptions.ConnectTimeout("slow"), "ConnectionError"),
+            (requests.exceptions.ReadTimeout("slow"), "Timeout"),
+            (requests.exceptions.TooManyRedirects("loop"), "TooManyRedirects"),
+        ]:
+            mock_post.side_effect = error
+            with self.assertRaises(Exception) as context:
+                client.create_template(template_data)
+            self.assertEqual(context.exception.error_type, error_type)
+            self.assertEqual(context.exception.request_url, mock_post.call_args[0][0])
+
+    @patch('integrations.services.requests.Session.get')
+    def test_get_template_status(self, mock_get):
         """Test retrieving template status from Meta."""
         WhatsAppConfig.objects.create(
             waba_id=self.waba_id,
@@ -516,11 +728,14 @@ class WhatsAppTemplateSyncTestCase(TestCase):
             )
 
 
+@override_settings(CACHES=LOCMEM_CACHES)
 class WhatsAppTemplatePullTestCase(TestCase):
     """Test cases for pulling templates from Meta (list_templates + --pull)."""
 
     def setUp(self):
         """Set up test fixtures."""
+        # The active config is cached; DB rollbacks between tests don't clear it
+        caches[ACTIVE_CONFIG_CACHE_ALIAS].clear()
         self.waba_id = "123456789"
         self.access_token = "test_token"
         self.meta_template = {
@@ -541,9 +756,8 @@ class WhatsAppTemplatePullTestCase(TestCase):
             is_active=True,
         )
 
-    @patch('integrations.services.requests.get')
-    @patch('integrations.services.WhatsApp')
-    def test_list_templates_single_page(self, mock_whatsapp, mock_get):
+    @patch('integrations.services.requests.Session.get')
+    def test_list_templates_single_page(self, mock_get):
         """Test fetching all templates from Meta in a single page."""
         self._create_config()
 
@@ -566,9 +780,8 @@ class WhatsAppTemplatePullTestCase(TestCase):
         self.assertIn(self.waba_id, called_url)
         self.assertIn("message_templates", called_url)
 
-    @patch('integrations.services.requests.get')
-    @patch('integrations.services.WhatsApp')
-    def test_list_templates_follows_pagination(self, mock_whatsapp, mock_get):
+    @patch('integrations.services.requests.Session.get')
+    def test_list_templates_follows_pagination(self, mock_get):
         """Test that list_templates follows paging.next across pages."""
         self._create_config()
 
@@ -598,8 +811,7 @@ class WhatsAppTemplatePullTestCase(TestCase):
         self.assertEqual(second_call[0][0], "https://graph.facebook.com/next-page")
         self.assertIsNone(second_call[1].get("params"))
 
-    @patch('integrations.services.WhatsApp')
-    def test_list_templates_no_waba_id(self, mock_whatsapp):
+    def test_list_templates_no_waba_id(self):
         """Test list_templates fails clearly without WABA_ID."""
         self._create_config(waba_id="")
 
@@ -609,8 +821,7 @@ class WhatsAppTemplatePullTestCase(TestCase):
 
         self.assertIn("WABA_ID not configured", str(context.exception))
 
-    @patch('integrations.services.WhatsApp')
-    def test_pull_command_upserts_templates(self, mock_whatsapp):
+    def test_pull_command_upserts_templates(self):
         """Test that --pull imports Meta templates into the local database."""
         from io import StringIO
         from django.core.management import call_command
@@ -660,8 +871,173 @@ class WhatsAppTemplatePullTestCase(TestCase):
         self.assertIn("PULL SUMMARY", output)
         self.assertIn("Templates in Meta: 2", output)
 
-    @patch('integrations.services.WhatsApp')
-    def test_pull_command_specific_template_filter(self, mock_whatsapp):
+    def test_sync_command_lists_meta_templates_once(self):
+        """Test that the sync reads Meta status from a single listing."""
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import WhatsAppTemplate
+
+        self._create_config()
+        approved_variant = dict(self.meta_template, language="en_US")
+
+        with patch.object(
+            WhatsAppClient, 'list_templates', return_value=[approved_variant]
+        ) as mock_list, patch.object(
+            WhatsAppClient, 'get_template_status'
+        ) as mock_status, patch.object(
+            WhatsAppClient, 'create_template'
+        ) as mock_create:
+            out = StringIO()
+            call_command(
+                'sync_whatsapp_templates', '--template', 'otp_verification', stdout=out
+            )
+
+        mock_list.assert_called_once()
+        mock_status.assert_not_called()
+        mock_create.assert_not_called()
+        otp = WhatsAppTemplate.objects.get(name="otp_verification", language="en")
+        self.assertEqual(otp.status, "APPROVED")
+        self.assertEqual(otp.template_id, "template_111")
+        self.assertIn("Skipped: 1", out.getvalue())
+
+    def test_sync_command_skips_unchanged_approved_templates(self):
+        """Test that an approved, unchanged template makes no API calls."""
+        from io import StringIO
+        from django.core.management import call_command
+        from .management.commands.sync_whatsapp_templates import hash_payload
+        from .models import WhatsAppTemplate
+        from .whatsapp_templates import convert_template_to_meta_format
+
+        self._create_config()
+        payload = convert_template_to_meta_format("otp_verification")
+        WhatsAppTemplate.objects.create(
+            name="otp_verification",
+            category="AUTHENTICATION",
+            language="en",
+            status="APPROVED",
+            template_id="template_111",
+            payload_hash=hash_payload(payload),
+        )
+
+        with patch.object(WhatsAppClient, 'list_templates') as mock_list, patch.object(
+            WhatsAppClient, 'create_template'
+        ) as mock_create:
+            out = StringIO()
+            call_command(
+                'sync_whatsapp_templates', '--template', 'otp_verification', stdout=out
+            )
+
+        mock_list.assert_not_called()
+        mock_create.assert_not_called()
+        self.assertIn("Skipped: 1", out.getvalue())
+
+    def test_sync_command_creates_missing_templates(self):
+        """Test that templates missing from Meta are created and stored."""
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import WhatsAppTemplate
+        from .whatsapp_templates import get_all_templates
+
+        self._create_config()
+
+        def create_template(payload):
+            return {"id": f"id_{payload['name']}", "status": "PENDING"}
+
+        with patch.object(
+            WhatsAppClient, 'list_templates', return_value=[]
+        ), patch.object(
+            WhatsAppClient, 'create_template', side_effect=create_template
+        ) as mock_create:
+            out = StringIO()
+            call_command('sync_whatsapp_templates', '--delay', '0', stdout=out)
+
+        templates = get_all_templates()
+        self.assertEqual(mock_create.call_count, len(templates))
+        self.assertEqual(WhatsAppTemplate.objects.count(), len(templates))
+        otp = WhatsAppTemplate.objects.get(name="otp_verification")
+        self.assertEqual(otp.template_id, "id_otp_verification")
+        self.assertEqual(otp.status, "PENDING")
+        self.assertIsNotNone(otp.last_synced_at)
+        self.assertIn(f"Successfully synced: {len(templates)}", out.getvalue())
+
+    def test_sync_command_failed_creation_writes_only_rejection_columns(self):
+        """Test that a failed creation updates only the columns it changed."""
+        from django.core.management import call_command
+        from .models import WhatsAppTemplate
+
+        self._create_config()
+
+        with patch.object(
+            WhatsAppClient, 'list_templates', return_value=[]
+        ), patch.object(
+            WhatsAppClient, 'create_template', side_effect=Exception("Invalid")
+        ), patch.object(
+            WhatsAppTemplate.objects, 'bulk_update'
+        ) as mock_bulk_update:
+            call_command('sync_whatsapp_templates', '--delay', '0', stdout=MagicMock())
+
+        mock_bulk_update.assert_called_once()
+        self.assertEqual(
+            mock_bulk_update.call_args[0][1],
+            ['payload_hash', 'rejection_reason', 'updated_at'],
+        )
+
+    def test_sync_command_stores_created_templates_when_interrupted(self):
+        """Test that templates created before an unexpected error are still stored."""
+        from django.core.management import call_command
+        from .models import WhatsAppTemplate
+        from .whatsapp_templates import get_all_templates
+
+        self._create_config()
+        first, second = list(get_all_templates())[:2]
+
+        def create_template(payload):
+            if payload['name'] == second:
+                return MagicMock(get=MagicMock(side_effect=RuntimeError("boom")))
+            return {"id": f"id_{payload['name']}", "status": "PENDING"}
+
+        with patch.object(
+            WhatsAppClient, 'list_templates', return_value=[]
+        ), patch.object(
+            WhatsAppClient, 'create_template', side_effect=create_template
+        ):
+            with self.assertRaises(RuntimeError):
+                call_command(
+                    'sync_whatsapp_templates', '--delay', '0', stdout=MagicMock()
+                )
+
+        stored = WhatsAppTemplate.objects.get(name=first)
+        self.assertEqual(stored.template_id, f"id_{first}")
+        self.assertIsNotNone(stored.last_synced_at)
+
+    def test_check_status_command_updates_local_templates(self):
+        """Test that --check-status updates local rows from the Meta listing."""
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import WhatsAppTemplate
+
+        self._create_config()
+        WhatsAppTemplate.objects.create(
+            name="otp_verification",
+            category="AUTHENTICATION",
+            language="en",
+            status="PENDING",
+        )
+
+        with patch.object(
+            WhatsAppClient, 'list_templates', return_value=[self.meta_template]
+        ) as mock_list:
+            out = StringIO()
+            call_command('sync_whatsapp_templates', '--check-status', stdout=out)
+
+        mock_list.assert_called_once()
+        otp = WhatsAppTemplate.objects.get(name="otp_verification", language="en")
+        self.assertEqual(otp.status, "APPROVED")
+        self.assertEqual(otp.template_id, "template_111")
+        self.assertIsNotNone(otp.last_synced_at)
+        self.assertIn("Not found in Meta", out.getvalue())
+
+    def test_pull_command_specific_template_filter(self):
         """Test that --pull --template only imports the named template."""
         from io import StringIO
         from django.core.management import call_command
@@ -687,8 +1063,7 @@ class WhatsAppTemplatePullTestCase(TestCase):
             WhatsAppTemplate.objects.filter(name="welcome_message").exists()
         )
 
-    @patch('integrations.services.WhatsApp')
-    def test_pull_command_no_waba_id(self, mock_whatsapp):
+    def test_pull_command_no_waba_id(self):
         """Test that --pull fails with a clear error when WABA_ID is missing."""
         from django.core.management import call_command
         from django.core.management.base import CommandError
@@ -699,3 +1074,157 @@ class WhatsAppTemplatePullTestCase(TestCase):
             call_command('sync_whatsapp_templates', '--pull')
 
         self.assertIn("WABA_ID not configured", str(context.exception))
+
+
+class WhatsAppAdminQuerysetTestCase(TestCase):
+    """Test cases for the integrations admin changelist querysets."""
+
+    def _request(self, url_name):
+        from django.test import RequestFactory
+
+        request = RequestFactory().get("/")
+        request.resolver_match = MagicMock(url_name=url_name)
+        return request
+
+    def test_template_changelist_defers_large_columns(self):
+        """The template changelist should not load rejection reasons or components."""
+        from django.contrib.admin.sites import AdminSite
+        from .admin import WhatsAppTemplateAdmin
+        from .models import WhatsAppTemplate
+
+        WhatsAppTemplate.objects.create(
+            name="otp_verification",
+            category="AUTHENTICATION",
+            language="en",
+            rejection_reason="x" * 400,
+        )
+        model_admin = WhatsAppTemplateAdmin(WhatsAppTemplate, AdminSite())
+
+        changelist = model_admin.get_queryset(
+            self._request("integrations_whatsapptemplate_changelist")
+        ).get()
+        self.assertEqual(
+            changelist.get_deferred_fields(),
+            {"rejection_reason", "components", "updated_at", "payload_hash"},
+        )
+
+        change = model_admin.get_queryset(
+            self._request("integrations_whatsapptemplate_change")
+        ).get()
+        self.assertEqual(change.get_deferred_fields(), set())
+
+    def test_config_changelist_defers_secrets(self):
+        """The config changelist should not load the access token or verify token."""
+        from django.contrib.admin.sites import AdminSite
+        from .admin import WhatsAppConfigAdmin
+
+        WhatsAppConfig.objects.create(
+            phone_number_id="test_phone_id",
+            access_token="test_token",
+            webhook_verify_token="test_verify_token",
+            is_active=True,
+        )
+        model_admin = WhatsAppConfigAdmin(WhatsAppConfig, AdminSite())
+
+        config = model_admin.get_queryset(
+            self._request("integrations_whatsappconfig_changelist")
+        ).get()
+        self.assertEqual(
+            config.get_deferred_fields(), {"access_token", "webhook_verify_token"}
+        )
+
+    def test_only_inactive_configs_can_be_deleted(self):
+        """The active config must be deactivated before it can be deleted."""
+        from django.contrib.admin.sites import AdminSite
+        from .admin import WhatsAppConfigAdmin
+
+        config = WhatsAppConfig.objects.create(
+            phone_number_id="test_phone_id",
+            access_token="test_token",
+            is_active=True,
+        )
+        model_admin = WhatsAppConfigAdmin(WhatsAppConfig, AdminSite())
+
+        with self.assertNumQueries(0):
+            self.assertFalse(model_admin.has_delete_permission(MagicMock(), config))
+        config.is_active = False
+        self.assertTrue(model_admin.has_delete_permission(MagicMock(), config))
+
+    def test_config_change_saves_changed_fields_only(self):
+        """Editing a config in the admin should write only the changed columns."""
+        from django.contrib.admin.sites import AdminSite
+        from .admin import WhatsAppConfigAdmin
+
+        config = WhatsAppConfig.objects.create(
+            phone_number_id="test_phone_id",
+            access_token="test_token",
+            is_active=True,
+        )
+        model_admin = WhatsAppConfigAdmin(WhatsAppConfig, AdminSite())
+        config.access_token = "rotated_token"
+        form = MagicMock(changed_data=["access_token"])
+
+        with patch.object(WhatsAppConfig, "save", autospec=True) as mock_save:
+            model_admin.save_model(MagicMock(), config, form, change=True)
+            mock_save.assert_called_once_with(
+                config, update_fields=["access_token", "updated_at"]
+            )
+
+            mock_save.reset_mock()
+            form.changed_data = []
+            model_admin.save_model(MagicMock(), config, form, change=True)
+            mock_save.assert_not_called()
+
+
+
+@override_settings(PAYNOW_INTEGRATION_ID="1234", PAYNOW_INTEGRATION_KEY="secret-key")
+class PaynowClientTestCase(TestCase):
+    """Test cases for Paynow request and webhook hashing."""
+
+    def setUp(self):
+        self.paynow = PaynowClient()
+        self.data = {"reference": "OVII-1", "amount": "10.00", "status": "Paid"}
+
+    def test_hash_matches_concatenated_values(self):
+        """The streamed hash equals SHA512 over the joined values plus the key."""
+        import hashlib
+
+        expected = hashlib.sha512(
+            "OVII-110.00Paidsecret-key".encode("utf-8")
+        ).hexdigest().upper()
+        self.assertEqual(self.paynow._hash_values(self.data.values()), expected)
+
+    def test_verify_webhook_hash(self):
+        """A webhook is accepted only with the matching hash."""
+        signed = {**self.data, "hash": self.paynow._hash_values(self.data.values())}
+        self.assertTrue(self.paynow.verify_webhook_hash(signed))
+
+        signed["amount"] = "100.00"
+        self.assertFalse(self.paynow.verify_webhook_hash(signed))
+        self.assertFalse(self.paynow.verify_webhook_hash(self.data))
+
+    def test_verify_webhook_hash_rejects_malformed_hash_without_hashing(self):
+        """A hash of the wrong length is rejected before anything is hashed."""
+        with patch.object(PaynowClient, "_hash_values") as mock_hash:
+            self.assertFalse(
+                self.paynow.verify_webhook_hash({**self.data, "hash": "ABC123"})
+            )
+        mock_hash.assert_not_called()
+
+    @patch('integrations.services.requests.Session.post')
+    def test_create_transaction_signs_fields_in_paynow_order(self, mock_post):
+        """The request hash covers the initiate fields in Paynow's order."""
+        from .services import PAYNOW_INITIATE_HASH_FIELDS
+
+        mock_post.return_value = MagicMock(
+            text="status=Ok&browserurl=https%3A%2F%2Fpaynow&pollurl=https%3A%2F%2Fpoll"
+        )
+
+        result = self.paynow.create_transaction("OVII-1", "10.00", "user@example.com")
+
+        self.assertEqual(result["browserurl"], "https://paynow")
+        sent = mock_post.call_args.kwargs["data"]
+        self.assertEqual(
+            sent["hash"],
+            self.paynow._hash_values(sent[key] for key in PAYNOW_INITIATE_HASH_FIELDS),
+        )
@@ -22,7 +22,7 @@ from .tasks import process_ecocash_withdrawal
 from .serializers import (
     PaynowTopUpRequestSerializer,
 )  # This import will now work correctly
-from .models import WhatsAppConfig
+from .models import get_active_whatsapp_config
 
 
 class EcoCashWithdrawalSerializer(serializers.Serializer):
@@ -257,7 +257,7 @@ class WhatsAppWebhookView(APIView):
         # Get verify token from database or environment
         verify_token = None
         try:
-            config = WhatsAppConfig.objects.filter(is_active=True).first()
+            config = get_active_whatsapp_config()
             if config:
                 verify_token = config.webhook_verify_token
         except Exception:
@@ -5,6 +5,8 @@ Description: WhatsApp message template definitions for Ovii.
 These templates need to be created and approved in Meta Business Manager.
 """
 
+from types import MappingProxyType
+
 # Button configuration constants
 FIRST_BUTTON_INDEX = "0"  # Index of the first button in WhatsApp template
 
@@ -315,14 +317,18 @@ def get_template_structure(template_name: str) -> dict:
     return WHATSAPP_TEMPLATES.get(template_name)
 
 
-def get_all_templates() -> dict:
+# Read-only view of the catalog, built once and shared by every caller.
+_ALL_TEMPLATES = MappingProxyType(WHATSAPP_TEMPLATES)
+
+
+def get_all_templates() -> MappingProxyType:
     """
     Get all available WhatsApp templates.
 
     Returns:
-        dict: All template definitions
+        MappingProxyType: Read-only mapping of all template definitions
     """
-    return WHATSAPP_TEMPLATES
+    return _ALL_TEMPLATES
 
 
 def format_template_components(template_name: str, variables: dict) -> list:
@@ -4,7 +4,7 @@ from django.utils import timezone
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from .models import Notification
-from integrations.services import WhatsAppClient
+from integrations.services import get_whatsapp_client
 from integrations.whatsapp_templates import format_template_components
 
 import logging
@@ -65,7 +65,7 @@ def send_whatsapp_notification(notification_id):
     """
     try:
         notification = Notification.objects.get(id=notification_id)
-        client = WhatsAppClient()
+        client = get_whatsapp_client()
         
         # Send the message via WhatsApp
         client.send_text_message(
@@ -105,7 +105,7 @@ def send_whatsapp_template(
         dict: Response from WhatsApp API
     """
     try:
-        client = WhatsAppClient()
+        client = get_whatsapp_client()
         components = format_template_components(template_name, variables)
         
         response = client.send_template_message(
@@ -60,8 +60,8 @@ class WhatsAppNotificationServiceTestCase(TestCase):
             last_name="User"
         )
 
-    @patch('notifications.services.WhatsAppClient')
-    def test_send_whatsapp_notification_success(self, mock_client_class):
+    @patch('notifications.services.get_whatsapp_client')
+    def test_send_whatsapp_notification_success(self, mock_get_client):
         """Test successful WhatsApp notification sending."""
         # Create notification
         notification = Notification.objects.create(
@@ -74,7 +74,7 @@ class WhatsAppNotificationServiceTestCase(TestCase):
         
         # Mock WhatsApp client
         mock_client = MagicMock()
-        mock_client_class.return_value = mock_client
+        mock_get_client.return_value = mock_client
         mock_client.send_text_message.return_value = {"messages": [{"id": "msg_123"}]}
         
         # Send notification
@@ -86,8 +86,8 @@ class WhatsAppNotificationServiceTestCase(TestCase):
         self.assertIsNotNone(notification.sent_at)
         mock_client.send_text_message.assert_called_once()
 
-    @patch('notifications.services.WhatsAppClient')
-    def test_send_whatsapp_notification_failure(self, mock_client_class):
+    @patch('notifications.services.get_whatsapp_client')
+    def test_send_whatsapp_notification_failure(self, mock_get_client):
         """Test failed WhatsApp notification sending."""
         # Create notification
         notification = Notification.objects.create(
@@ -100,7 +100,7 @@ class WhatsAppNotificationServiceTestCase(TestCase):
         
         # Mock WhatsApp client to raise exception
         mock_client = MagicMock()
-        mock_client_class.return_value = mock_client
+        mock_get_client.return_value = mock_client
         mock_client.send_text_message.side_effect = Exception("API Error")
         
         # Send notification
@@ -110,16 +110,16 @@ class WhatsAppNotificationServiceTestCase(TestCase):
         notification.refresh_from_db()
         self.assertEqual(notification.status, Notification.Status.FAILED)
 
-    @patch('notifications.services.WhatsAppClient')
+    @patch('notifications.services.get_whatsapp_client')
     @patch('notifications.services.format_template_components')
-    def test_send_whatsapp_template_success(self, mock_format, mock_client_class):
+    def test_send_whatsapp_template_success(self, mock_format, mock_get_client):
         """Test successful WhatsApp template sending."""
         mock_format.return_value = [
             {"type": "body", "parameters": [{"type": "text", "text": "123456"}]}
         ]
         
         mock_client = MagicMock()
-        mock_client_class.return_value = mock_client
+        mock_get_client.return_value = mock_client
         mock_client.send_template_message.return_value = {"messages": [{"id": "msg_789"}]}
         
         response = send_whatsapp_template(
@@ -299,7 +299,11 @@ TEMPLATES = [
 # ------------------------------------------------------------------
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.OviiJWTAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ),
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.AnonRateThrottle",
@@ -350,6 +354,18 @@ CHANNEL_LAYERS = {
     },
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Shared by the web and Celery workers, so an invalidation reaches every
+    # process. Used for data that must not go stale per process.
+    "shared": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{redis_host}:6379/1",
+    },
+}
+
 CELERY_BROKER_URL = f"redis://{redis_host}:6379/0"
 CELERY_RESULT_BACKEND = f"redis://{redis_host}:6379/0"
 CELERY_ACCEPT_CONTENT = ["json"]
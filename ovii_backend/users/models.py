@@ -24,6 +24,10 @@ def generate_referral_code(length=8):
     alphabet = string.ascii_uppercase + string.digits
     return ''.join(secrets.choice(alphabet) for _ in range(length))
 
+def hash_pin(raw_pin):
+    """Returns the hash stored in `OviiUser.pin` for a raw transaction PIN."""
+    return make_password(raw_pin)
+
 def FileSizeValidator(value): # Custom validator for file size
     limit = 2 * 1024 * 1024  # 2MB
     if value.size > limit:
@@ -231,7 +235,7 @@ class OviiUser(AbstractUser):
 
     def set_pin(self, raw_pin):
         """Hashes and sets the user's transaction PIN."""
-        self.pin = make_password(raw_pin)
+        self.pin = hash_pin(raw_pin)
 
     def check_pin(self, raw_pin):
         """Checks a raw PIN against the stored hash."""
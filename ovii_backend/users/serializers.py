@@ -4,15 +4,30 @@ Date: 2024-05-20
 Description: Defines serializers for the users app.
 """
 
+import re
+from django.core.validators import RegexValidator
 from rest_framework import serializers
+from django.db import transaction
 from django.utils import timezone
 from phonenumber_field.serializerfields import PhoneNumberField
-from rest_framework_simplejwt.tokens import RefreshToken
 from .models import OviiUser, OTPRequest, KYCDocument, VerificationLevels, Referral
-from .tasks import generate_and_log_otp, create_user_wallet
+from .tasks import (
+    generate_and_log_otp,
+    create_otp_request,
+    send_otp_message,
+    create_user_wallet,
+)
+from .services import issue_tokens
 from django_countries.serializer_fields import CountryField
 
 
+# Compiled once at import. ASCII digits only: str.isdigit() also accepts
+# characters such as superscripts that are not valid PIN digits.
+validate_numeric_pin = RegexValidator(
+    regex=re.compile(r"\A[0-9]+\Z"), message="PIN must be numeric."
+)
+
+
 class UserDetailSerializer(serializers.ModelSerializer):
     """
     Serializer for retrieving and updating user details.
@@ -122,7 +137,11 @@ class SetTransactionPINSerializer(serializers.Serializer):
     """Serializer for setting or changing a user's transaction PIN."""
 
     pin = serializers.CharField(
-        write_only=True, style={"input_type": "password"}, min_length=4, max_length=4
+        write_only=True,
+        style={"input_type": "password"},
+        min_length=4,
+        max_length=4,
+        validators=[validate_numeric_pin],
     )
     pin_confirmation = serializers.CharField(
         write_only=True, style={"input_type": "password"}
@@ -133,8 +152,6 @@ class SetTransactionPINSerializer(serializers.Serializer):
             raise serializers.ValidationError(
                 {"pin_confirmation": "PINs do not match."}
             )
-        if not data["pin"].isdigit():
-            raise serializers.ValidationError({"pin": "PIN must be numeric."})
         return data
 
 
@@ -189,20 +206,21 @@ class InitialRegistrationSerializer(serializers.Serializer):
     def create(self, validated_data):
         # Extract referrer if referral code was provided
         referrer = validated_data.pop("referral_code", None)
+        phone_number = str(validated_data["phone_number"])
 
-        # Create an inactive user first.
-        user = OviiUser.objects.create_user(is_active=False, **validated_data)
+        with transaction.atomic():
+            # Create an inactive user first, linked to the referrer if one was found.
+            OviiUser.objects.create_user(
+                is_active=False, referred_by=referrer, **validated_data
+            )
+            # Save the OTP here so its request_id can be returned immediately;
+            # the WhatsApp delivery runs in the background once the rows are committed.
+            otp_request = create_otp_request(phone_number)
+            transaction.on_commit(
+                lambda: send_otp_message.delay(phone_number, otp_request.code)
+            )
 
-        # If a valid referrer was found, set the referred_by relationship
-        if referrer:
-            user.referred_by = referrer
-            user.save(update_fields=["referred_by"])
-
-        # Now, trigger the OTP generation for this phone number.
-        phone_number = validated_data["phone_number"]
-        task_result = generate_and_log_otp.delay(str(phone_number))
-        request_id = task_result.get()
-        return {"request_id": request_id, "phone_number": str(phone_number)}
+        return {"request_id": str(otp_request.request_id), "phone_number": phone_number}
 
 
 class OTPRequestSerializer(serializers.Serializer):
@@ -285,16 +303,9 @@ class UserLoginSerializer(BaseOTPVerificationSerializer):
         # Re-fetch the user from the database to ensure we have the latest data.
         user.refresh_from_db()
 
-        refresh = RefreshToken.for_user(user)
-        # Add custom claims to the access token
-        refresh.access_token["has_set_pin"] = user.has_set_pin
-
         return {
             "user": UserDetailSerializer(user).data,
-            "tokens": {
-                "refresh": str(refresh),
-                "access": str(refresh.access_token),
-            },
+            "tokens": issue_tokens(user),
             "__debug_has_set_pin": user.has_set_pin,
         }
 
@@ -344,19 +355,12 @@ class UserRegistrationVerifySerializer(BaseOTPVerificationSerializer):
         create_user_wallet.delay(user.id)
         otp_request.delete()
 
-        refresh = RefreshToken.for_user(user)
-        # Add custom claims to the access token
-        refresh.access_token["has_set_pin"] = user.has_set_pin
-
         return {
             "__debug_user_data__": UserDetailSerializer(
                 user
             ).data,  # Temporary debug line
             "user": UserDetailSerializer(user).data,
-            "tokens": {
-                "refresh": str(refresh),
-                "access": str(refresh.access_token),
-            },
+            "tokens": issue_tokens(user),
         }
 
 
@@ -442,7 +446,11 @@ class VerifyAndResetPINSerializer(BaseOTPVerificationSerializer):
     """
 
     new_pin = serializers.CharField(
-        write_only=True, style={"input_type": "password"}, min_length=4, max_length=4
+        write_only=True,
+        style={"input_type": "password"},
+        min_length=4,
+        max_length=4,
+        validators=[validate_numeric_pin],
     )
     new_pin_confirmation = serializers.CharField(
         write_only=True, style={"input_type": "password"}, min_length=4, max_length=4
@@ -457,8 +465,6 @@ class VerifyAndResetPINSerializer(BaseOTPVerificationSerializer):
             raise serializers.ValidationError(
                 {"new_pin_confirmation": "PINs do not match."}
             )
-        if not attrs["new_pin"].isdigit():
-            raise serializers.ValidationError({"new_pin": "PIN must be numeric."})
 
         # Verify the OTP belongs to the authenticated user
         otp_request = attrs["otp_request"]
@@ -480,14 +486,7 @@ class VerifyAndResetPINSerializer(BaseOTPVerificationSerializer):
         # Delete the used OTP
         otp_request.delete()
 
-        # Issue new tokens with updated has_set_pin claim
-        refresh = RefreshToken.for_user(user)
-        refresh.access_token["has_set_pin"] = user.has_set_pin
-
         return {
             "detail": "PIN reset successfully.",
-            "tokens": {
-                "refresh": str(refresh),
-                "access": str(refresh.access_token),
-            },
+            "tokens": issue_tokens(user),
         }
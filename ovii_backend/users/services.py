@@ -9,6 +9,7 @@ from decimal import Decimal
 from django.db import transaction
 from django.utils import timezone
 from django.conf import settings
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from .models import Referral, OviiUser
 
@@ -106,6 +107,29 @@ def credit_referral_bonuses(referral_id: int) -> Referral:
         return referral
 
 
+def issue_tokens(user: OviiUser) -> dict:
+    """
+    Issues a refresh/access token pair for a user.
+
+    The custom `has_set_pin` claim is stamped on the refresh token, so it is
+    copied into this access token and into every access token later minted
+    by the token refresh endpoint. The access token is derived exactly once,
+    because every read of `RefreshToken.access_token` builds a new token.
+
+    Args:
+        user: The OviiUser to issue tokens for.
+
+    Returns:
+        A dict with the encoded 'refresh' and 'access' tokens.
+    """
+    refresh = RefreshToken.for_user(user)
+    refresh["has_set_pin"] = user.has_set_pin
+    return {
+        "refresh": str(refresh),
+        "access": str(refresh.access_token),
+    }
+
+
 def get_referral_bonus_amounts() -> dict:
     """
     Returns the configured referral bonus amounts.
@@ -16,11 +16,9 @@ from wallets.models import Wallet
 logger = logging.getLogger("users.otp")
 
 
-@shared_task
-def generate_and_log_otp(phone_number):
+def create_otp_request(phone_number):
     """
-    Generates a 6-digit OTP, saves it, and sends it via WhatsApp.
-    Falls back to logging if WhatsApp is not configured.
+    Generates a 6-digit OTP and saves it. Returns the OTPRequest.
     """
     code = str(secrets.randbelow(900000) + 100000)  # 6-digit OTP
     otp_request = OTPRequest.objects.create(phone_number=phone_number, code=code)
@@ -29,8 +27,14 @@ def generate_and_log_otp(phone_number):
     logger.info(
         f"OTP for {phone_number}: {code} (Request ID: {otp_request.request_id})"
     )
+    return otp_request
 
-    # Send OTP via WhatsApp
+
+@shared_task
+def send_otp_message(phone_number, code):
+    """
+    Sends an OTP via WhatsApp. Falls back to logging if WhatsApp is not configured.
+    """
     try:
         from notifications.services import send_whatsapp_template
 
@@ -44,6 +48,15 @@ def generate_and_log_otp(phone_number):
         logger.error(f"Failed to send OTP via WhatsApp to {phone_number}: {e}")
         # Continue execution even if WhatsApp fails - OTP is still logged
 
+
+@shared_task
+def generate_and_log_otp(phone_number):
+    """
+    Generates a 6-digit OTP, saves it, and sends it via WhatsApp.
+    Falls back to logging if WhatsApp is not configured.
+    """
+    otp_request = create_otp_request(phone_number)
+    send_otp_message(phone_number, otp_request.code)
     return str(otp_request.request_id)
 
 
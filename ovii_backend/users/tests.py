@@ -1,9 +1,10 @@
+from unittest.mock import patch
 from django.test import TestCase
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 from decimal import Decimal
-from .models import OviiUser, FileSizeValidator, Referral
+from .models import OviiUser, OTPRequest, FileSizeValidator, Referral
 from wallets.models import Wallet, Transaction
 
 
@@ -186,6 +187,42 @@ class PINFunctionalityTest(TestCase):
         self.assertNotEqual(self.user.pin, "1234")
         self.assertTrue(len(self.user.pin) > 4)
 
+    def test_set_pin_serializer_requires_ascii_digits(self):
+        """Test that only ASCII digits are accepted as a PIN."""
+        from .serializers import SetTransactionPINSerializer
+
+        for pin in ("12a4", "\u00b9234"):
+            serializer = SetTransactionPINSerializer(
+                data={"pin": pin, "pin_confirmation": pin}
+            )
+            self.assertFalse(serializer.is_valid())
+            self.assertIn("pin", serializer.errors)
+
+        serializer = SetTransactionPINSerializer(
+            data={"pin": "1234", "pin_confirmation": "1234"}
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_issued_access_token_carries_has_set_pin_claim(self):
+        """Test that the issued access token includes the has_set_pin claim."""
+        from rest_framework_simplejwt.tokens import AccessToken
+        from .services import issue_tokens
+
+        self.user.has_set_pin = True
+        tokens = issue_tokens(self.user)
+        access = AccessToken(tokens["access"])
+        self.assertTrue(access["has_set_pin"])
+
+    def test_refreshed_access_token_keeps_has_set_pin_claim(self):
+        """Test that access tokens minted from the refresh token keep the claim."""
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from .services import issue_tokens
+
+        self.user.has_set_pin = True
+        tokens = issue_tokens(self.user)
+        refreshed = RefreshToken(tokens["refresh"]).access_token
+        self.assertTrue(refreshed["has_set_pin"])
+
 
 class ReferralBonusCreditTest(TestCase):
     """Tests for the referral bonus credit service."""
@@ -345,4 +382,27 @@ class ReferralEligibilityTest(TestCase):
         self.user.is_active = True
         self.user.has_set_pin = True
         self.user.save()
-        self.assertTrue(check_referral_eligibility(self.user))
\ No newline at end of file
+        self.assertTrue(check_referral_eligibility(self.user))
+
+class InitialRegistrationTest(TestCase):
+    """Tests for the first registration step."""
+
+    @patch("users.serializers.send_otp_message")
+    def test_registration_defers_otp_delivery_until_commit(self, mock_send):
+        from .serializers import InitialRegistrationSerializer
+
+        serializer = InitialRegistrationSerializer(
+            data={
+                "first_name": "Test",
+                "last_name": "User",
+                "phone_number": "+263771234567",
+            }
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            result = serializer.save()
+
+        otp_request = OTPRequest.objects.get(request_id=result["request_id"])
+        self.assertFalse(OviiUser.objects.get(phone_number="+263771234567").is_active)
+        self.assertEqual(len(callbacks), 1)
+        mock_send.delay.assert_called_once_with("+263771234567", otp_request.code)
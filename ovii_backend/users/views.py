@@ -15,12 +15,14 @@ from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.throttling import AnonRateThrottle
 from wallets.permissions import IsMobileVerifiedOrHigher
+from core.exceptions import logged_exception_handler
+from core.pagination import StandardCursorPagination
 
-from .models import OviiUser, KYCDocument, VerificationLevels, Referral
+from .models import OviiUser, KYCDocument, VerificationLevels, Referral, hash_pin
 from .tasks import process_referral_bonus
+from .services import issue_tokens
 from wallets.models import Transaction
 from .serializers import (
     UserDetailSerializer,
@@ -145,32 +147,20 @@ class UserRegistrationStartView(generics.CreateAPIView):
     serializer_class = InitialRegistrationSerializer
     permission_classes = [AllowAny]
 
+    def get_exception_handler(self):
+        # Log validation errors and turn unexpected ones into a logged 500
+        return logged_exception_handler
+
     def create(self, request, *args, **kwargs):
         """
         Handles new user registration and returns user data and tokens.
         """
         serializer = self.get_serializer(data=request.data)
-        try:
-            serializer.is_valid(raise_exception=True)
-            response_data = serializer.save()
-            logger.info(
-                f"New user registration started for phone: {serializer.validated_data['phone_number']}"
-            )
-            return Response(response_data, status=status.HTTP_201_CREATED)
-        except ValidationError as e:
-            logger.warning(
-                f"Initial registration failed for data: {request.data}. Error: {e.detail}"
-            )
-            raise
-        except Exception as e:
-            logger.error(
-                f"An unexpected error occurred during initial registration. Error: {e}",
-                exc_info=True,
-            )
-            return Response(
-                {"detail": "An unexpected server error occurred."},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+        serializer.is_valid(raise_exception=True)
+        response_data = serializer.save()
+        phone_number = serializer.validated_data["phone_number"]
+        logger.info(f"New user registration started for phone: {phone_number}")
+        return Response(response_data, status=status.HTTP_201_CREATED)
 
 
 class UserRegistrationVerifyView(generics.CreateAPIView):
@@ -181,31 +171,20 @@ class UserRegistrationVerifyView(generics.CreateAPIView):
     serializer_class = UserRegistrationVerifySerializer
     permission_classes = [AllowAny]
 
+    def get_exception_handler(self):
+        # Log validation errors and turn unexpected ones into a logged 500
+        return logged_exception_handler
+
     def create(self, request, *args, **kwargs):
         """
         Handles OTP verification, activates the user, and returns tokens.
         """
         serializer = self.get_serializer(data=request.data)
-        try:
-            serializer.is_valid(raise_exception=True)
-            response_data = serializer.save()
-            user_id = response_data.get("user", {}).get("id")
-            logger.info(f"New user registration successful. User ID: {user_id}")
-            return Response(response_data, status=status.HTTP_201_CREATED)
-        except ValidationError as e:
-            logger.warning(
-                f"User registration failed for data: {request.data}. Error: {e.detail}"
-            )
-            raise
-        except Exception as e:
-            logger.error(
-                f"An unexpected error occurred during user registration. Error: {e}",
-                exc_info=True,
-            )
-            return Response(
-                {"detail": "An unexpected server error occurred."},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+        serializer.is_valid(raise_exception=True)
+        response_data = serializer.save()
+        user_id = response_data.get("user", {}).get("id")
+        logger.info(f"New user registration successful. User ID: {user_id}")
+        return Response(response_data, status=status.HTTP_201_CREATED)
 
 
 class SetTransactionPINView(generics.GenericAPIView):
@@ -227,22 +206,28 @@ class SetTransactionPINView(generics.GenericAPIView):
         serializer = self.get_serializer(data=request.data)
         try:
             serializer.is_valid(raise_exception=True)
-            user.set_pin(serializer.validated_data["pin"])
+            hashed_pin = hash_pin(serializer.validated_data["pin"])
+            # A single conditional UPDATE; it also guards against a concurrent
+            # request having set the PIN since the check above.
+            updated = OviiUser.objects.filter(pk=user.pk, has_set_pin=False).update(
+                pin=hashed_pin, has_set_pin=True
+            )
+            if not updated:
+                return Response(
+                    {"detail": "Transaction PIN has already been set."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            user.pin = hashed_pin
             user.has_set_pin = True
-            user.save(update_fields=["pin", "has_set_pin"])
 
             # After setting the PIN, issue a new token with the updated 'has_set_pin' claim.
-            refresh = RefreshToken.for_user(user)
-            refresh.access_token["has_set_pin"] = user.has_set_pin
+            tokens = issue_tokens(user)
 
             logger.info(f"Transaction PIN set successfully for user: {request.user.id}")
             return Response(
                 {
                     "detail": "PIN set successfully.",
-                    "tokens": {
-                        "refresh": str(refresh),
-                        "access": str(refresh.access_token),
-                    },
+                    "tokens": tokens,
                 },
                 status=status.HTTP_200_OK,
             )
@@ -269,14 +254,19 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
 
     queryset = OviiUser.objects.all()
     permission_classes = [IsAuthenticated]
+    # Write methods use the restricted update serializer; everything else reads.
+    serializer_classes_by_method = {
+        "PUT": UserProfileUpdateSerializer,
+        "PATCH": UserProfileUpdateSerializer,
+    }
 
     def get_object(self):
         return self.request.user
 
     def get_serializer_class(self):
-        if self.request.method in ["PUT", "PATCH"]:
-            return UserProfileUpdateSerializer
-        return UserDetailSerializer
+        return self.serializer_classes_by_method.get(
+            self.request.method, UserDetailSerializer
+        )
 
     def update(self, request, *args, **kwargs):
         response = super().update(request, *args, **kwargs)
@@ -318,9 +308,14 @@ class KYCDocumentViewSet(
 
     serializer_class = KYCDocumentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = StandardCursorPagination
 
     def get_queryset(self):
-        return KYCDocument.objects.filter(user=self.request.user)
+        return (
+            KYCDocument.objects.filter(user=self.request.user)
+            .only(*KYCDocumentSerializer.Meta.fields)
+            .order_by("-id")
+        )
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
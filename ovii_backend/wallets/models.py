@@ -216,6 +216,23 @@ class Transaction(models.Model):
         help_text=_("The original transaction this compensation reverses."),
     )
 
+    class Meta:
+        indexes = [
+            # History lookups filter on one side of the transaction and page by
+            # newest first, so each side gets its own (wallet, -timestamp) index.
+            models.Index(fields=["wallet", "-timestamp"], name="txn_wallet_ts_desc"),
+            models.Index(
+                fields=["related_wallet", "-timestamp"],
+                name="txn_related_wallet_ts_desc",
+            ),
+            # Agent commission history only ever reads COMMISSION rows.
+            models.Index(
+                fields=["wallet", "-timestamp"],
+                name="txn_commission_ts",
+                condition=models.Q(transaction_type="COMMISSION"),
+            ),
+        ]
+
     @property
     def is_compensation(self) -> bool:
         return self.transaction_type == self.TransactionType.COMPENSATION